@@ -0,0 +1,33 @@
+"""add_marked_question_result_partial_index
+
+Revision ID: 5f2b7d09e3ac
+Revises: c41d8e2a9b17
+Create Date: 2026-10-16 10:03:18.227940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2b7d09e3ac'
+down_revision: Union[str, None] = 'c41d8e2a9b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Partial index covering the mark IS NOT NULL predicate used by the stats queries
+    op.create_index(
+        'ix_qr_marked',
+        'question_result',
+        ['assessment_id', 'student_id', 'question_id'],
+        postgresql_where=sa.text('mark IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    # Drop partial index
+    op.drop_index('ix_qr_marked', table_name='question_result')
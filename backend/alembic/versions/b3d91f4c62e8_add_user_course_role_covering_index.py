@@ -0,0 +1,34 @@
+"""add_user_course_role_covering_index
+
+Revision ID: b3d91f4c62e8
+Revises: 5f2b7d09e3ac
+Create Date: 2026-10-16 11:24:07.861352
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d91f4c62e8'
+down_revision: Union[str, None] = '5f2b7d09e3ac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Covering index for the membership lookups by (user_id, course_id) that also
+    # read course_role_id, so they are answered by an index-only scan.
+    # (user_id, course_id) is the primary key, which already makes each row unique.
+    op.create_index(
+        'ix_ucr_user_course_role',
+        'user_course_role',
+        ['user_id', 'course_id', 'course_role_id'],
+    )
+
+
+def downgrade() -> None:
+    # Drop covering index
+    op.drop_index('ix_ucr_user_course_role', table_name='user_course_role')
@@ -0,0 +1,33 @@
+"""add_stats_composite_indexes
+
+Revision ID: c41d8e2a9b17
+Revises: a6035079f22e
+Create Date: 2026-10-16 09:12:41.508213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d8e2a9b17'
+down_revision: Union[str, None] = 'a6035079f22e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Composite indexes for the course/assessment statistics queries.
+    # (assessment_id, student_id) and (assessment_id, question_number) are already
+    # served by uq_question_result_assessment_student_question and
+    # uq_question_number_per_assessment respectively.
+    op.create_index('ix_qr_assessment_marknull', 'question_result', ['assessment_id', 'mark'])
+    op.create_index('ix_ucr_course_role', 'user_course_role', ['course_id', 'course_role_id'])
+
+
+def downgrade() -> None:
+    # Drop indexes
+    op.drop_index('ix_ucr_course_role', table_name='user_course_role')
+    op.drop_index('ix_qr_assessment_marknull', table_name='question_result')
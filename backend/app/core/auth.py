@@ -1,7 +1,7 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from app.dependencies import get_db
 from app.models.user import User
 from app.core.security import decode_token
@@ -22,7 +22,15 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == user_id).first()
+    # Course roles are loaded up front for the in-memory access checks
+    user = (
+        db.query(User)
+        .options(selectinload(User.course_roles))
+        .filter(User.id == user_id)
+        .first()
+    )
     if user is None:
         raise credentials_exception
+    # Role mask for the validators' admin fast path (plain attribute, not a column)
+    user._role_bits = 1 << user.primary_role_id
     return user
@@ -17,6 +17,12 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./test.db"
     FRONTEND_URL: str = "*"
     ENV: str = "dev"
+
+    # Connection pool sizing for the SQLAlchemy engine (ignored for SQLite).
+    # Conservative defaults; raise them through the environment per deployment
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800  # seconds before a pooled connection is replaced
     
     # JWT Secret Key - MUST be set in production via environment variable
     SECRET_KEY: str = "dev-insecure-secret-change-in-production"
@@ -38,3 +44,8 @@ class Settings(BaseSettings):
 
 
 settings = Settings()
+
+
+def get_settings() -> Settings:
+    """Settings dependency, so routes can be given different settings in tests"""
+    return settings
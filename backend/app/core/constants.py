@@ -11,6 +11,9 @@ class PrimaryRoles:
     ADMINISTRATOR = 1
     STAFF = 2
     STUDENT = 3
+    
+    # Bit of each role in the per-request role mask (1 << role id)
+    ADMINISTRATOR_BIT = 1 << ADMINISTRATOR
 
 
 class CourseRoles:
@@ -40,6 +43,7 @@ class Limits:
     DEFAULT_PAGE_SIZE = 100
     MAX_PAGE_SIZE = 1000
     MAX_FILE_SIZE_MB = 50
+    UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB read size when streaming uploads to disk
     QUERY_DUPLICATE_WINDOW_MINUTES = 5  # Time window to prevent duplicate queries
 
 
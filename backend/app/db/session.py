@@ -6,21 +6,35 @@ This file initializes the SQLAlchemy database engine and session factory.
   sessions (one per request), which are injected into route handlers via FastAPI dependencies.
 
 It uses the DATABASE_URL defined in the app's configuration (config.py).
-Also includes special connection arguments if using SQLite for local development.
+`create_db_engine` applies the pool settings from config.py, or the special
+connection arguments if using SQLite for local development.
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
 DATABASE_URL = settings.DATABASE_URL
 
-# Extra config for SQLite
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+
+def create_db_engine(url: str) -> Engine:
+    """Create an engine with the application's connection pool configuration."""
+    # Extra config for SQLite
+    if url.startswith("sqlite"):
+        return create_engine(url, connect_args={"check_same_thread": False})
+    return create_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+
 
 # Create the engine (the core DB connection)
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+engine = create_db_engine(DATABASE_URL)
 
 # SessionLocal is the class that makes DB sessions per request
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,42 @@
+"""
+Portable column types shared by the models.
+
+`UUID` is stored natively on PostgreSQL and as CHAR(36) on other databases
+(SQLite for local development and tests). It accepts uuid.UUID objects or
+their string form, so ids taken from tokens or paths can be compared directly.
+"""
+
+import uuid
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import CHAR, TypeDecorator
+
+
+class UUID(TypeDecorator):
+    """UUID column type, native on PostgreSQL and CHAR(36) elsewhere."""
+
+    impl = CHAR(36)
+    cache_ok = True
+
+    def __init__(self, as_uuid: bool = True):
+        super().__init__()
+        self.as_uuid = as_uuid
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(CHAR(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value if dialect.name == "postgresql" else str(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value if self.as_uuid else str(value)
@@ -1,9 +1,12 @@
+import hashlib
+
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from app.core.config import settings
 from app.dependencies import register_dependencies
+from app.utils.validators import auth_cache, new_auth_cache
 from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
@@ -33,6 +36,7 @@ app = FastAPI(
     description="Backend for managing and grading assessment papers using FastAPI",
     version="1.0.0",
     lifespan=register_dependencies(),
+    default_response_class=ORJSONResponse,
 )
 
 # Add rate limiter state and exception handler
@@ -47,8 +51,8 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.frontend_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type", "If-None-Match"],
 )
 
 
@@ -72,6 +76,55 @@ async def add_security_headers(request: Request, call_next):
     return response
 
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak If-None-Match comparison: "*" or any listed tag, ignoring W/ prefixes"""
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+# Conditional GET - tag JSON responses with a body hash and answer 304 when
+# the client already holds the same representation
+@app.middleware("http")
+async def json_etag(request: Request, call_next):
+    response = await call_next(request)
+    if (
+        request.method != "GET"
+        or response.status_code != 200
+        or not response.headers.get("content-type", "").startswith("application/json")
+    ):
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    # Copy raw_headers rather than a dict so repeated fields like Set-Cookie survive
+    raw_headers = [(k, v) for k, v in response.raw_headers if k != b"etag"]
+    raw_headers.append((b"etag", etag.encode("latin-1")))
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        tagged = Response(status_code=304)
+        tagged.raw_headers = [
+            (k, v) for k, v in raw_headers if k not in (b"content-length", b"content-type")
+        ]
+        return tagged
+    tagged = Response(content=body, status_code=response.status_code)
+    tagged.raw_headers = raw_headers
+    return tagged
+
+
+# Request-scoped cache for entity and course access lookups
+@app.middleware("http")
+async def authorization_cache(request: Request, call_next):
+    request.state.auth_cache = new_auth_cache()
+    token = auth_cache.set(request.state.auth_cache)
+    try:
+        return await call_next(request)
+    finally:
+        auth_cache.reset(token)
+
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     print("Validation error for request:", await request.body())
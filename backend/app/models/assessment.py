@@ -1,10 +1,10 @@
 from sqlalchemy import Column, String, ForeignKey, DateTime, Text, Boolean
-from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
 
 from app.db.base import Base
+from app.db.types import UUID
 
 
 class Assessment(Base):
@@ -1,10 +1,10 @@
 from sqlalchemy import Column, ForeignKey, Float, String, DateTime, Index
-from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
 
 from app.db.base import Base
+from app.db.types import UUID
 
 
 class QuestionResult(Base):
@@ -43,4 +43,12 @@ class QuestionResult(Base):
             "question_id",
             unique=True,
         ),
+        Index("ix_qr_assessment_marknull", "assessment_id", "mark"),
+        Index(
+            "ix_qr_marked",
+            "assessment_id",
+            "student_id",
+            "question_id",
+            postgresql_where=mark.isnot(None),
+        ),
     )
@@ -1,10 +1,10 @@
 from sqlalchemy import Column, ForeignKey, String, DateTime, Index
-from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
 
 from app.db.base import Base
+from app.db.types import UUID
 
 
 class UploadedFile(Base):
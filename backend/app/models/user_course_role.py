@@ -1,8 +1,8 @@
-from sqlalchemy import Column, ForeignKey, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, ForeignKey, Integer, Index
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
+from app.db.types import UUID
 
 
 class UserCourseRole(Base):
@@ -30,3 +30,8 @@ class UserCourseRole(Base):
     user = relationship("User", back_populates="course_roles")
     course = relationship("Course", back_populates="user_roles")
     course_role = relationship("CourseRole", back_populates="user_course_roles")
+
+    __table_args__ = (
+        Index("ix_ucr_course_role", "course_id", "course_role_id"),
+        Index("ix_ucr_user_course_role", "user_id", "course_id", "course_role_id"),
+    )
@@ -1,4 +1,3 @@
-import shutil
 from typing import List
 from fastapi import (
     APIRouter,
@@ -8,7 +7,7 @@ from fastapi import (
     File,
     Form,
 )
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from uuid import UUID, uuid4
 from pathlib import Path
@@ -26,7 +25,11 @@ from app.core.security import can_create_assessments
 from app.dependencies import get_db
 from app.core.config import settings
 from app.utils.validators import EntityValidator, AccessValidator, FileValidator
-from app.services.file_storage_service import file_storage_service
+from app.services.file_storage_service import (
+    FileStorage,
+    file_storage_service,
+    get_file_storage,
+)
 from app.services.assessment_service import assessment_service
 from app.services.export_service import csv_export_service
 
@@ -37,7 +40,7 @@ storage_path.mkdir(parents=True, exist_ok=True)
 
 
 @router.post("/upload/question-paper", response_model=dict)
-def upload_question_paper(
+async def upload_question_paper(
     file: UploadFile = File(...),
     course_id: str = Form(...),
     assessment_id: str = Form(...),
@@ -47,7 +50,7 @@ def upload_question_paper(
     FileValidator.validate_pdf_file(file.filename)
     
     # Save file using service
-    file_path = file_storage_service.save_question_paper(
+    file_path = await file_storage_service.save_question_paper(
         file, UUID(course_id), UUID(assessment_id)
     )
     
@@ -55,28 +58,26 @@ def upload_question_paper(
 
 
 @router.post("/upload", response_model=AssessmentOut)
-def upload_assessment(
+async def upload_assessment(
     title: str = Form(...),
     course_id: UUID = Form(...),
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    storage: FileStorage = Depends(get_file_storage),
 ):
     if not can_create_assessments(current_user, course_id):
         raise HTTPException(status_code=403, detail="Not authorized to create assessments")
 
     file_id = uuid4()
     filename = f"{file_id}_{file.filename}"
-    file_path = storage_path / filename
-
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    file_path = await storage.save_upload(file, storage_path / filename)
 
     db_assessment = Assessment(
         id=file_id,
         title=title,
         course_id=course_id,
-        question_paper_file_path=str(file_path),
+        question_paper_file_path=file_path,
     )
     db.add(db_assessment)
     db.commit()
@@ -103,6 +104,7 @@ def download_question_paper(
     assessment_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    storage: FileStorage = Depends(get_file_storage),
 ):
     # Validate assessment exists and user has access
     assessment = EntityValidator.get_assessment_or_404(db, assessment_id)
@@ -111,14 +113,8 @@ def download_question_paper(
     if not assessment.question_paper_file_path:
         raise HTTPException(status_code=404, detail="Question paper not found")
 
-    file_path = Path(assessment.question_paper_file_path)
-    print(f"Serving question paper: {file_path} (exists: {file_path.exists()})")
-    
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="File missing")
-
-    return FileResponse(
-        file_path, filename=file_path.name, media_type="application/pdf"
+    return storage.file_response(
+        assessment.question_paper_file_path, media_type="application/pdf"
     )
 
 
@@ -1,19 +1,30 @@
 from pathlib import Path
 import zipfile
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import FileResponse
-from app.core.config import settings
-import json
+from app.core.config import Settings, get_settings
+import orjson
 import tempfile
 
 from app.schemas.uploaded_file import ExportRequest
-from app.services.pdf_annotation_service import pdf_annotation_service
+from app.services.pdf_annotation_service import (
+    PdfAnnotationService,
+    pdf_annotation_service,
+)
 
 router = APIRouter(prefix="/export", tags=["Export"])
 
 
+def get_pdf_annotation_service() -> PdfAnnotationService:
+    return pdf_annotation_service
+
+
 @router.post("/annotated-pdfs")
-async def export_annotated_pdfs(request: ExportRequest):
+async def export_annotated_pdfs(
+    request: ExportRequest,
+    settings: Settings = Depends(get_settings),
+    annotation_service: PdfAnnotationService = Depends(get_pdf_annotation_service),
+):
     course_id = request.course_id
     assessment_id = request.assessment_id
 
@@ -40,8 +51,8 @@ async def export_annotated_pdfs(request: ExportRequest):
             annotations = []
             for annotation_file in annotation_dir.glob("*.json"):
                 try:
-                    with open(annotation_file, "r") as f:
-                        data = json.load(f)
+                    with open(annotation_file, "rb") as f:
+                        data = orjson.loads(f.read())
                         page_number = data.get("page")
                         if page_number is None:
                             filename = annotation_file.stem
@@ -97,7 +108,7 @@ async def export_annotated_pdfs(request: ExportRequest):
                 continue
 
             output_pdf = temp_dir / f"{student_id}_annotated.pdf"
-            pdf_annotation_service.burn_annotations_to_pdf(
+            annotation_service.burn_annotations_to_pdf(
                 str(pdf_file), str(output_pdf), annotations
             )
             zipf.write(output_pdf, arcname=f"{student_id}.pdf")
@@ -1,5 +1,4 @@
 from datetime import datetime, timezone
-import os
 from fastapi import (
     APIRouter,
     Depends,
@@ -8,11 +7,10 @@ from fastapi import (
     File,
     Form,
 )
-from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from uuid import UUID, uuid4
 from pathlib import Path
-import shutil
+import orjson
 
 from app.schemas.question_result import (
     QuestionResultCreate,
@@ -26,6 +24,7 @@ from app.models.user import User
 from app.dependencies import get_db, get_current_user
 from app.core.config import settings
 from app.utils.validators import EntityValidator, AccessValidator
+from app.services.file_storage_service import FileStorage, get_file_storage
 
 router = APIRouter(prefix="/question-results", tags=["Question Results"])
 
@@ -85,7 +84,7 @@ def update_mark(
 
 
 @router.post("/upload-annotation", response_model=QuestionResultOut)
-def upload_annotation(
+async def upload_annotation(
     assessment_id: UUID = Form(...),
     student_id: UUID = Form(...),
     question_id: UUID = Form(...),
@@ -95,6 +94,7 @@ def upload_annotation(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    storage: FileStorage = Depends(get_file_storage),
 ):
     validate_marker_access(db, current_user, assessment_id)
 
@@ -125,18 +125,14 @@ def upload_annotation(
         / str(assessment_id)
         / str(student_id)
     )
-    os.makedirs(path, exist_ok=True)
-
-    file_path = path / f"{question_result_id}.json"
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    file_path = await storage.save_upload(file, path / f"{question_result_id}.json")
 
     if question_result:
         # Only update mark and comment if this is not an annotation-only save
         if annotation_only.lower() != "true":
             question_result.mark = mark
             question_result.comment = comment
-        question_result.annotation_file_path = str(file_path)
+        question_result.annotation_file_path = file_path
         question_result.updated_at = datetime.now(timezone.utc)
     else:
         # Create new record - for annotation-only saves, don't set mark
@@ -149,7 +145,7 @@ def upload_annotation(
                 marker_id=current_user.id,
                 mark=None,  # Don't set mark for annotation-only saves
                 comment="",
-                annotation_file_path=str(file_path),
+                annotation_file_path=file_path,
             )
         else:
             question_result = QuestionResult(
@@ -160,7 +156,7 @@ def upload_annotation(
                 marker_id=current_user.id,
                 mark=mark,
                 comment=comment,
-                annotation_file_path=str(file_path),
+                annotation_file_path=file_path,
             )
     db.add(question_result)
 
@@ -200,6 +196,7 @@ def download_annotation(
     result_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    storage: FileStorage = Depends(get_file_storage),
 ):
     result = db.query(QuestionResult).filter(QuestionResult.id == result_id).first()
     if not result or not result.annotation_file_path:
@@ -207,12 +204,8 @@ def download_annotation(
 
     validate_marker_access(db, current_user, result.assessment_id)
 
-    file_path = Path(result.annotation_file_path)
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="File missing")
-
-    return FileResponse(
-        file_path, filename=file_path.name, media_type="application/json"
+    return storage.file_response(
+        result.annotation_file_path, media_type="application/json"
     )
 
 
@@ -349,9 +342,8 @@ def get_student_all_question_results(
             try:
                 annotation_path = Path(result.annotation_file_path)
                 if annotation_path.exists():
-                    import json
-                    with open(annotation_path, 'r') as f:
-                        annotation_data = json.load(f)
+                    with open(annotation_path, 'rb') as f:
+                        annotation_data = orjson.loads(f.read())
             except Exception as e:
                 print(f"Error loading annotation: {e}")
         
@@ -6,7 +6,7 @@ from sqlalchemy import func
 from uuid import UUID
 from pathlib import Path
 import tempfile
-import json
+import orjson
 
 from app.dependencies import get_db, get_current_user
 from app.models.user import User
@@ -172,7 +172,7 @@ def get_my_assessment_results(
 ):
     """Get detailed results for a specific assessment for the current student"""
     # Validate assessment exists and user has course access
-    assessment = EntityValidator.get_assessment_or_404(db, assessment_id)
+    assessment = EntityValidator.get_assessment_with_course_or_404(db, assessment_id)
     AccessValidator.validate_course_access(db, current_user, assessment.course_id)
     
     # Check if student can view this assessment (must be published for students)
@@ -376,8 +376,8 @@ def download_annotated_pdf(
         if annotation_folder.exists():
             for annotation_file in annotation_folder.glob("*.json"):
                 try:
-                    with open(annotation_file, "r") as f:
-                        data = json.load(f)
+                    with open(annotation_file, "rb") as f:
+                        data = orjson.loads(f.read())
                         
                         # Try to get page number from the data, or infer from filename
                         page_number = data.get("page")
@@ -8,7 +8,6 @@ from fastapi import (
     File,
     Form,
 )
-from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from uuid import UUID, uuid4
 from pathlib import Path
@@ -27,6 +26,7 @@ from app.dependencies import get_current_user
 from app.core.security import can_manage_assessments, can_manage_course
 from app.utils.validators import EntityValidator, AccessValidator, FileValidator
 from app.core.constants import PrimaryRoles
+from app.services.file_storage_service import FileStorage, get_file_storage
 
 
 router = APIRouter(prefix="/uploaded-files", tags=["Uploaded Files"])
@@ -91,12 +91,13 @@ def bulk_upload_answer_sheets(
 
 
 @router.post("/upload", response_model=UploadedFileOut)
-def upload_file(
+async def upload_file(
     assessment_id: UUID = Form(...),
     student_id: UUID = Form(...),
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    storage: FileStorage = Depends(get_file_storage),
 ):
     # Validate assessment exists
     assessment = EntityValidator.get_assessment_or_404(db, assessment_id)
@@ -120,17 +121,14 @@ def upload_file(
 
     file_id = uuid4()
     filename = f"{file_id}_{file.filename}"
-    file_path = storage_path / filename
-
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    file_path = await storage.save_upload(file, storage_path / filename)
 
     db_file = UploadedFile(
         id=file_id,
         assessment_id=assessment_id,
         student_id=student_id,
         uploaded_by=current_user.id,
-        answer_sheet_file_path=str(file_path),
+        answer_sheet_file_path=file_path,
     )
     db.add(db_file)
     db.commit()
@@ -143,6 +141,7 @@ def download_answer_sheet(
     file_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    storage: FileStorage = Depends(get_file_storage),
 ):
     file = db.query(UploadedFile).filter(UploadedFile.id == file_id).first()
     if not file or not file.answer_sheet_file_path:
@@ -157,12 +156,8 @@ def download_answer_sheet(
     ):
         raise HTTPException(status_code=403, detail="Access denied")
 
-    file_path = Path(file.answer_sheet_file_path)
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="File missing")
-
-    return FileResponse(
-        file_path, filename=file_path.name, media_type="application/pdf"
+    return storage.file_response(
+        file.answer_sheet_file_path, media_type="application/pdf"
     )
 
 
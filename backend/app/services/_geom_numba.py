@@ -0,0 +1,224 @@
+"""
+Numba-compiled geometry kernels
+
+Scalar inner loops for the eraser detection in PdfAnnotationService.
+They are plain module-level functions (no ``self``), so numba compiles
+them down to straight float arithmetic.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, fastmath=True, inline="always")
+def _closest_t_on_seg(px, py, ax, ay, bx, by):
+    """Return t in [0,1] where segment AB is closest to point P"""
+    vx = bx - ax
+    vy = by - ay
+    denom = vx * vx + vy * vy
+    if denom == 0.0:
+        return 0.0
+    t = ((px - ax) * vx + (py - ay) * vy) / denom
+    if t < 0.0:
+        return 0.0
+    if t > 1.0:
+        return 1.0
+    return t
+
+
+@njit(cache=True, fastmath=True, inline="always")
+def _dist2_point_to_seg(px, py, ax, ay, bx, by):
+    """Squared distance from point P to segment AB"""
+    t = _closest_t_on_seg(px, py, ax, ay, bx, by)
+    dx = px - (ax + t * (bx - ax))
+    dy = py - (ay + t * (by - ay))
+    return dx * dx + dy * dy
+
+
+@njit(cache=True, fastmath=True, inline="always")
+def _linear_range(alpha, beta, lo, hi):
+    """Range of t with lo <= alpha + beta * t <= hi, as (t0, t1)"""
+    if abs(beta) < 1e-12:
+        if lo <= alpha <= hi:
+            return -1.0, 2.0  # holds for every t in [0,1]
+        return 1.0, 0.0
+    t0 = (lo - alpha) / beta
+    t1 = (hi - alpha) / beta
+    if t0 > t1:
+        return t1, t0
+    return t0, t1
+
+
+@njit(cache=True, fastmath=True, inline="always")
+def _disk_range(wx, wy, ux, uy, r):
+    """Range of t with |W + t * U| <= r, as (t0, t1)"""
+    a = ux * ux + uy * uy
+    b = ux * wx + uy * wy
+    c = wx * wx + wy * wy - r * r
+    if a < 1e-12:
+        if c <= 0.0:
+            return -1.0, 2.0
+        return 1.0, 0.0
+    disc = b * b - a * c
+    if disc < 0.0:
+        return 1.0, 0.0
+    root = np.sqrt(disc)
+    return (-b - root) / a, (-b + root) / a
+
+
+@njit(cache=True, fastmath=True)
+def _seg_capsule_interval(ax, ay, ux, uy, cx, cy, dx, dy, r):
+    """
+    Parameter range [t0, t1] (clipped to [0,1]) where A + t*U lies inside
+    the capsule with centerline CD and radius r. Returns t0 > t1 if the
+    segment misses the capsule.
+
+    The capsule is the union of the disks at C and D and the rectangle
+    around CD. It is convex, so the segment enters and leaves it once and
+    the result is the hull of the three per-piece ranges.
+    """
+    lo = 2.0
+    hi = -1.0
+
+    t0, t1 = _disk_range(ax - cx, ay - cy, ux, uy, r)
+    if t0 <= t1:
+        lo = min(lo, t0)
+        hi = max(hi, t1)
+    t0, t1 = _disk_range(ax - dx, ay - dy, ux, uy, r)
+    if t0 <= t1:
+        lo = min(lo, t0)
+        hi = max(hi, t1)
+
+    vx = dx - cx
+    vy = dy - cy
+    L2 = vx * vx + vy * vy
+    if L2 > 0.0:
+        # Projection onto CD within [0, L2] and offset from the line within r
+        wx = ax - cx
+        wy = ay - cy
+        p0, p1 = _linear_range(wx * vx + wy * vy, ux * vx + uy * vy, 0.0, L2)
+        half = r * np.sqrt(L2)
+        q0, q1 = _linear_range(vx * wy - vy * wx, vx * uy - vy * ux, -half, half)
+        t0 = max(p0, q0)
+        t1 = min(p1, q1)
+        if t0 <= t1:
+            lo = min(lo, t0)
+            hi = max(hi, t1)
+
+    return max(lo, 0.0), min(hi, 1.0)
+
+
+@njit(cache=True)
+def _kept_intervals(ax, ay, bx, by, cap_ax, cap_ay, cap_bx, cap_by, cap_r, idx):
+    """
+    Parameter intervals of segment AB that survive every capsule in idx.
+    Returns a (k, 2) array of [t0, t1] rows in increasing order.
+    """
+    ux = bx - ax
+    uy = by - ay
+    n = idx.shape[0]
+    starts = np.empty(n)
+    ends = np.empty(n)
+    m = 0
+    for k in range(n):
+        i = idx[k]
+        t0, t1 = _seg_capsule_interval(
+            ax, ay, ux, uy, cap_ax[i], cap_ay[i], cap_bx[i], cap_by[i], cap_r[i]
+        )
+        if t0 <= t1:
+            starts[m] = t0
+            ends[m] = t1
+            m += 1
+
+    # Merge erased intervals in order of entry and keep the gaps
+    order = np.argsort(starts[:m])
+    out = np.empty((m + 1, 2))
+    k = 0
+    cursor = 0.0
+    for j in range(m):
+        t0 = starts[order[j]]
+        if t0 > cursor:
+            out[k, 0] = cursor
+            out[k, 1] = t0
+            k += 1
+        cursor = max(cursor, ends[order[j]])
+    if cursor < 1.0:
+        out[k, 0] = cursor
+        out[k, 1] = 1.0
+        k += 1
+    return out[:k]
+
+
+@njit(cache=True)
+def _weld_runs(xs, ys, tol2):
+    """
+    Group eraser samples into capsules. A run starting at sample i absorbs
+    the following samples for as long as every skipped sample lies within
+    sqrt(tol2) of the start-to-end chord, so the skipped sample pairs stay
+    within that distance of it too. Returns the start and end sample index
+    of every run.
+    """
+    n = xs.shape[0]
+    starts = np.empty(max(n - 1, 0), dtype=np.int64)
+    ends = np.empty(max(n - 1, 0), dtype=np.int64)
+    m = 0
+    start = 0
+    while start < n - 1:
+        end = start + 1
+        while end + 1 < n:
+            ax = xs[start]
+            ay = ys[start]
+            bx = xs[end + 1]
+            by = ys[end + 1]
+            on_chord = True
+            for k in range(start + 1, end + 1):
+                if _dist2_point_to_seg(xs[k], ys[k], ax, ay, bx, by) > tol2:
+                    on_chord = False
+                    break
+            if not on_chord:
+                break
+            end += 1
+        starts[m] = start
+        ends[m] = end
+        m += 1
+        start = end
+    return starts[:m], ends[:m]
+
+
+@njit(cache=True)
+def _csr_candidates(cell_start, cell_items, nx, ix0, iy0, ix1, iy1, stamp, epoch):
+    """
+    Unique capsule indices stored in grid cells [ix0..ix1] x [iy0..iy1].
+    stamp[i] == epoch marks capsules already emitted by this query, so the
+    scratch array never needs clearing between queries.
+    """
+    total = 0
+    for iy in range(iy0, iy1 + 1):
+        total += cell_start[iy * nx + ix1 + 1] - cell_start[iy * nx + ix0]
+    out = np.empty(total, dtype=np.int32)
+    n = 0
+    for iy in range(iy0, iy1 + 1):
+        # Cells ix0..ix1 of a row are contiguous in cell_items
+        for k in range(cell_start[iy * nx + ix0], cell_start[iy * nx + ix1 + 1]):
+            i = cell_items[k]
+            if stamp[i] != epoch:
+                stamp[i] = epoch
+                out[n] = i
+                n += 1
+    return out[:n]
+
+
+_warmed_up = False
+
+
+def warm_up():
+    """Compile (or load from cache) the eraser kernels, once per process"""
+    global _warmed_up
+    if _warmed_up:
+        return
+    ones = np.ones(1)
+    zeros = np.zeros(2, dtype=np.int32)
+    _kept_intervals(0.0, 0.0, 1.0, 0.0, ones, ones, ones, ones, ones, zeros[:1])
+    _csr_candidates(zeros, zeros[:0], 1, 0, 0, 0, 0, zeros, 1)
+    _weld_runs(np.zeros(2), np.zeros(2), 0.0)
+    _warmed_up = True
@@ -5,6 +5,7 @@ This service contains complex business logic related to courses,
 including statistics, user management, and bulk operations.
 """
 
+from collections import defaultdict
 from typing import List, Dict, Any
 from uuid import UUID
 from sqlalchemy.orm import Session
@@ -21,7 +22,19 @@ from app.core.constants import CourseRoles
 
 
 class CourseStatsService:
-    """Service for calculating course statistics."""
+    """
+    Service for calculating course statistics.
+    
+    The aggregate queries here rely on these indexes (keep them in sync with
+    the models and migrations so the queries don't fall back to seq-scans):
+    - ix_qr_assessment_marknull: question_result (assessment_id, mark)
+    - ix_qr_marked: question_result (assessment_id, student_id, question_id)
+      WHERE mark IS NOT NULL
+    - uq_question_result_assessment_student_question: question_result
+      (assessment_id, student_id, question_id)
+    - ix_ucr_course_role: user_course_role (course_id, course_role_id)
+    - uq_question_number_per_assessment: question (assessment_id, question_number)
+    """
     
     @staticmethod
     def calculate_course_stats(
@@ -50,18 +63,13 @@ class CourseStatsService:
         # Get all assessments for the course
         assessments = db.query(Assessment).filter(Assessment.course_id == course_id).all()
         
-        assessment_stats = []
-        total_scores = []
+        assessment_stats = CourseStatsService._calculate_assessment_stats(db, assessments)
         
-        for assessment in assessments:
-            stats = CourseStatsService._calculate_assessment_stats_for_course(
-                db, assessment
-            )
-            assessment_stats.append(stats)
-            
-            # Collect scores for overall average
-            if stats['averageScore'] > 0:
-                total_scores.append(stats['averageScore'])
+        # Collect scores for overall average
+        total_scores = [
+            stats['averageScore'] for stats in assessment_stats
+            if stats['averageScore'] > 0
+        ]
         
         # Calculate overall average performance
         average_performance = (
@@ -76,84 +84,107 @@ class CourseStatsService:
         }
     
     @staticmethod
-    def _calculate_assessment_stats_for_course(
+    def _calculate_assessment_stats(
         db: Session,
-        assessment: Assessment
-    ) -> Dict[str, Any]:
-        """Calculate statistics for a single assessment within course context."""
-        # Get total questions
-        total_questions = (
-            db.query(Question)
-            .filter(Question.assessment_id == assessment.id)
-            .count()
-        )
+        assessments: List[Assessment]
+    ) -> List[Dict[str, Any]]:
+        """
+        Calculate statistics for every assessment of a course.
         
-        # Get submission count
-        submission_count = (
-            db.query(UploadedFile.student_id)
-            .filter(UploadedFile.assessment_id == assessment.id)
-            .distinct()
-            .count()
+        Each aggregate is one query grouped by assessment, so the number of
+        queries does not grow with the number of assessments.
+        """
+        if not assessments:
+            return []
+        assessment_ids = [assessment.id for assessment in assessments]
+        
+        # Question count and total possible marks per assessment
+        question_totals = {
+            assessment_id: (count, total_possible or 0)
+            for assessment_id, count, total_possible in (
+                db.query(
+                    Question.assessment_id,
+                    func.count(Question.id),
+                    func.sum(Question.max_marks),
+                )
+                .filter(Question.assessment_id.in_(assessment_ids))
+                .group_by(Question.assessment_id)
+            )
+        }
+        
+        # Distinct submitting students per assessment
+        submission_counts = dict(
+            db.query(
+                UploadedFile.assessment_id,
+                func.count(func.distinct(UploadedFile.student_id)),
+            )
+            .filter(UploadedFile.assessment_id.in_(assessment_ids))
+            .group_by(UploadedFile.assessment_id)
         )
         
-        # Get questions marked count
-        questions_marked = (
-            db.query(QuestionResult)
-            .filter(QuestionResult.assessment_id == assessment.id)
+        # Marked question count and mark total per (assessment, student)
+        marked_by_student: Dict[UUID, List[Any]] = defaultdict(list)
+        for assessment_id, marked_count, total_marks in (
+            db.query(
+                QuestionResult.assessment_id,
+                func.count(QuestionResult.question_id),
+                func.sum(QuestionResult.mark),
+            )
+            .filter(QuestionResult.assessment_id.in_(assessment_ids))
             .filter(QuestionResult.mark.isnot(None))
-            .count()
+            .group_by(QuestionResult.assessment_id, QuestionResult.student_id)
+        ):
+            marked_by_student[assessment_id].append((marked_count, total_marks))
+        
+        # Pending query count per assessment
+        query_counts = dict(
+            db.query(MarkQuery.assessment_id, func.count(MarkQuery.id))
+            .filter(MarkQuery.assessment_id.in_(assessment_ids))
+            .filter(MarkQuery.status == 'pending')
+            .group_by(MarkQuery.assessment_id)
         )
         
-        # Get students completely marked
+        return [
+            CourseStatsService._build_assessment_stats(
+                assessment,
+                *question_totals.get(assessment.id, (0, 0)),
+                submission_counts.get(assessment.id, 0),
+                marked_by_student.get(assessment.id, []),
+                query_counts.get(assessment.id, 0),
+            )
+            for assessment in assessments
+        ]
+    
+    @staticmethod
+    def _build_assessment_stats(
+        assessment: Assessment,
+        total_questions: int,
+        total_possible: float,
+        submission_count: int,
+        marked_by_student: List[Any],
+        query_count: int
+    ) -> Dict[str, Any]:
+        """Assemble one assessment's statistics from the grouped aggregates."""
+        # Every marked result counts, whoever it belongs to
+        questions_marked = sum(marked_count for marked_count, _ in marked_by_student)
+        
+        # Students with a mark for every question
         students_completely_marked = 0
         if total_questions > 0 and submission_count > 0:
-            students_with_all_marks = (
-                db.query(QuestionResult.student_id)
-                .filter(QuestionResult.assessment_id == assessment.id)
-                .filter(QuestionResult.mark.isnot(None))
-                .group_by(QuestionResult.student_id)
-                .having(func.count(QuestionResult.question_id) == total_questions)
-                .count()
+            students_completely_marked = sum(
+                1 for marked_count, _ in marked_by_student
+                if marked_count == total_questions
             )
-            students_completely_marked = students_with_all_marks
-        
-        # Calculate total possible marks
-        total_possible = (
-            db.query(func.sum(Question.max_marks))
-            .filter(Question.assessment_id == assessment.id)
-            .scalar()
-        ) or 0
-        
-        # Calculate average score by student totals
-        # Get sum of marks per student, then average those sums
-        if total_possible > 0 and submission_count > 0:
-            student_totals = (
-                db.query(
-                    QuestionResult.student_id,
-                    func.sum(QuestionResult.mark).label('total_marks')
-                )
-                .filter(QuestionResult.assessment_id == assessment.id)
-                .filter(QuestionResult.mark.isnot(None))
-                .group_by(QuestionResult.student_id)
-                .subquery()
-            )
-            
+        
+        # Average of the per-student mark totals, as a percentage
+        avg_percentage = 0.0
+        if total_possible > 0 and submission_count > 0 and marked_by_student:
             avg_student_total = (
-                db.query(func.avg(student_totals.c.total_marks))
-                .scalar()
+                sum(total_marks for _, total_marks in marked_by_student)
+                / len(marked_by_student)
             )
-            
-            avg_percentage = (float(avg_student_total) / total_possible * 100) if avg_student_total else 0.0
-        else:
-            avg_percentage = 0.0
-        
-        # Get pending query count
-        query_count = (
-            db.query(MarkQuery)
-            .filter(MarkQuery.assessment_id == assessment.id)
-            .filter(MarkQuery.status == 'pending')
-            .count()
-        )
+            if avg_student_total:
+                avg_percentage = float(avg_student_total) / total_possible * 100
         
         return {
             "id": str(assessment.id),
@@ -7,9 +7,9 @@ for assessment results and course rosters.
 
 import csv
 from io import StringIO
-from collections import defaultdict
 from typing import List, Dict, Any
 from uuid import UUID
+import numpy as np
 from sqlalchemy.orm import Session
 
 from app.models.question import Question
@@ -60,22 +60,31 @@ class CSVExportService:
         if not results:
             raise ValueError("No results found for this assessment")
         
-        # Organize results by student
-        students = defaultdict(
-            lambda: {
-                "first_name": "",
-                "last_name": "",
-                "student_number": "",
-                "marks": {qid: None for qid in question_ids},
-            }
-        )
+        # Organize results by student; marks go into a (students x questions) matrix
+        qid_to_col = {qid: col for col, qid in enumerate(question_ids)}
+        students: Dict[UUID, Dict[str, Any]] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        values: List[float] = []
         
         for result, user in results:
-            s = students[user.id]
-            s["first_name"] = user.first_name
-            s["last_name"] = user.last_name
-            s["student_number"] = user.student_number
-            s["marks"][result.question_id] = result.mark
+            s = students.get(user.id)
+            if s is None:
+                s = students[user.id] = {
+                    "first_name": user.first_name,
+                    "last_name": user.last_name,
+                    "student_number": user.student_number,
+                    "row": len(students),
+                }
+            col = qid_to_col.get(result.question_id)
+            if col is not None and result.mark is not None:
+                rows.append(s["row"])
+                cols.append(col)
+                values.append(result.mark)
+        
+        marks = np.zeros((len(students), len(question_ids)), dtype=np.float64)
+        marks[rows, cols] = values
+        totals = marks.sum(axis=1)
         
         # Generate CSV
         output = StringIO()
@@ -85,11 +94,10 @@ class CSVExportService:
         header = ["student_number", "first_name", "last_name"] + question_labels + ["total"]
         writer.writerow(header)
         
-        # Write student rows
-        for s in students.values():
-            marks = [(s["marks"].get(qid) or 0) for qid in question_ids]
-            total = sum(marks)
-            row = [s["student_number"], s["first_name"], s["last_name"]] + marks + [total]
+        # Write student rows; unmarked cells and zero totals are written as 0, not 0.0
+        for s, row_marks, total in zip(students.values(), marks.tolist(), totals.tolist()):
+            row_marks = [mark or 0 for mark in row_marks]
+            row = [s["student_number"], s["first_name"], s["last_name"]] + row_marks + [total or 0]
             writer.writerow(row)
         
         output.seek(0)
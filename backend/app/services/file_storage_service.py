@@ -6,13 +6,23 @@ and deleting files for assessments and student submissions.
 """
 
 import os
-import shutil
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Protocol
 from uuid import UUID, uuid4
-from fastapi import UploadFile
+import aiofiles
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import FileResponse, Response
 
 from app.core.config import settings
+from app.core.constants import Limits
+
+
+class FileStorage(Protocol):
+    """Where routes put uploaded files and serve them back from."""
+
+    async def save_upload(self, file: UploadFile, file_path: Path) -> str: ...
+
+    def file_response(self, path_string: str, media_type: str) -> Response: ...
 
 
 class FileStorageService:
@@ -27,7 +37,41 @@ class FileStorageService:
         self.question_paper_path.mkdir(parents=True, exist_ok=True)
         self.answer_sheet_path.mkdir(parents=True, exist_ok=True)
     
-    def save_question_paper(
+    def _question_paper_dir(self, course_id: UUID, assessment_id: UUID) -> Path:
+        """Resolve (and create) the question paper directory for an assessment."""
+        # storage/pdfs/question_papers/{course_id}/{assessment_id}/
+        destination_dir = self.question_paper_path / str(course_id) / str(assessment_id)
+        destination_dir.mkdir(parents=True, exist_ok=True)
+        return destination_dir
+    
+    def _answer_sheet_dir(self, course_id: Optional[UUID], assessment_id: UUID) -> Path:
+        """Resolve (and create) the answer sheet directory for an assessment."""
+        if course_id:
+            destination_dir = self.answer_sheet_path / str(course_id) / str(assessment_id)
+        else:
+            destination_dir = self.answer_sheet_path / str(assessment_id)
+        destination_dir.mkdir(parents=True, exist_ok=True)
+        return destination_dir
+    
+    async def _write_upload(self, file: UploadFile, file_path: Path) -> None:
+        """
+        Stream an uploaded file to disk in fixed-size chunks.
+        
+        Reads straight from the UploadFile into the destination so large
+        uploads are not copied through the spooled temporary file a second time.
+        
+        Args:
+            file: The uploaded file object
+            file_path: Destination path
+        """
+        async with aiofiles.open(file_path, "wb") as out:
+            while True:
+                chunk = await file.read(Limits.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                await out.write(chunk)
+    
+    async def save_question_paper(
         self,
         file: UploadFile,
         course_id: UUID,
@@ -44,21 +88,18 @@ class FileStorageService:
         Returns:
             Path to the saved file
         """
-        # Create directory structure: storage/pdfs/question_papers/{course_id}/{assessment_id}/
-        destination_dir = self.question_paper_path / str(course_id) / str(assessment_id)
-        destination_dir.mkdir(parents=True, exist_ok=True)
+        destination_dir = self._question_paper_dir(course_id, assessment_id)
         
         # Generate unique filename
         file_path = destination_dir / f"{uuid4()}_{file.filename}"
         
         # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await self._write_upload(file, file_path)
         
         print(f"Question paper saved: {file_path}")
         return file_path
     
-    def save_answer_sheet(
+    async def save_answer_sheet(
         self,
         file: UploadFile,
         student_id: UUID,
@@ -77,24 +118,51 @@ class FileStorageService:
         Returns:
             Path to the saved file
         """
-        # Create directory structure
-        if course_id:
-            destination_dir = self.answer_sheet_path / str(course_id) / str(assessment_id)
-        else:
-            destination_dir = self.answer_sheet_path / str(assessment_id)
-        
-        destination_dir.mkdir(parents=True, exist_ok=True)
+        destination_dir = self._answer_sheet_dir(course_id, assessment_id)
         
         # Generate unique filename with student ID
         file_path = destination_dir / f"{student_id}_{uuid4()}_{file.filename}"
         
         # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await self._write_upload(file, file_path)
         
         print(f"Answer sheet saved: {file_path}")
         return file_path
     
+    async def save_upload(self, file: UploadFile, file_path: Path) -> str:
+        """
+        Stream an uploaded file to disk, creating its directory if needed.
+        
+        Args:
+            file: The uploaded file object
+            file_path: Destination path
+            
+        Returns:
+            The stored path as a string, as recorded on the database row
+        """
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        await self._write_upload(file, file_path)
+        return str(file_path)
+    
+    def file_response(self, path_string: str, media_type: str) -> Response:
+        """
+        Serve a stored file.
+        
+        Args:
+            path_string: Stored path, as returned by save_upload
+            media_type: Content type of the response
+            
+        Returns:
+            FileResponse streaming the file
+            
+        Raises:
+            HTTPException: 404 if the file is missing
+        """
+        file_path = Path(path_string)
+        if not file_path.exists():
+            raise HTTPException(status_code=404, detail="File missing")
+        return FileResponse(file_path, filename=file_path.name, media_type=media_type)
+    
     def delete_file(self, file_path: Path) -> bool:
         """
         Safely delete a file.
@@ -144,3 +212,8 @@ class FileStorageService:
 
 # Create a singleton instance
 file_storage_service = FileStorageService()
+
+
+def get_file_storage() -> FileStorage:
+    """Storage dependency, so tests can swap in an in-memory backend"""
+    return file_storage_service
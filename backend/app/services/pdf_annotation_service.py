@@ -7,9 +7,49 @@ with spatial indexing for performance.
 """
 
 import fitz  # PyMuPDF
-from typing import List, Tuple, Dict, Any
+import numpy as np
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import groupby
+from typing import List, Tuple, Dict, Any, Optional
 from pathlib import Path
 
+from app.services._geom_numba import (
+    _csr_candidates,
+    _kept_intervals,
+    _weld_runs,
+    warm_up,
+)
+
+
+NAMED_COLORS = {
+    "black": "#000000",
+    "white": "#ffffff",
+    "red": "#ff0000",
+    "green": "#00ff00",
+    "blue": "#0000ff",
+    "yellow": "#ffff00",
+    "cyan": "#00ffff",
+    "magenta": "#ff00ff",
+}
+
+
+# Bounds that overlap nothing, for an eraser without capsules
+EMPTY_AABB = (float("inf"), float("inf"), float("-inf"), float("-inf"))
+
+# A polyline piece: (k, 2) points, (k - 1, 4) edge AABBs and its overall
+# (minx, miny, maxx, maxy) bounds
+Segment = Tuple[np.ndarray, np.ndarray, Tuple[float, float, float, float]]
+
+
+@lru_cache(maxsize=256)
+def _hex_to_rgb(color: str) -> Tuple[float, float, float]:
+    """Convert hex color or named color to RGB tuple (0-1 range)"""
+    if not color.startswith("#"):
+        color = NAMED_COLORS.get(color.lower(), "#000000")
+    color = color.lstrip("#")
+    return tuple(int(color[i : i + 2], 16) / 255 for i in (0, 2, 4))
+
 
 class PdfAnnotationService:
     """
@@ -29,6 +69,12 @@ class PdfAnnotationService:
     ERASER_DEFAULT_WIDTH_PERCENT = 1.5
     ERASER_SCALE_FACTOR = 0.7
     ASSUMED_PAGE_WIDTH_PX = 600
+    # Eraser samples within this many pixels of a longer capsule's centerline
+    # are welded into it. Welded capsules grow by the same amount, so they
+    # still cover the stroke and reach at most twice this past it
+    ERASER_WELD_TOLERANCE = 0.05
+    # Text annotations are always drawn in red
+    TEXT_COLOR = _hex_to_rgb("red")
     
     def __init__(self, debug: bool = False):
         self.debug = debug
@@ -42,23 +88,8 @@ class PdfAnnotationService:
     # Color conversion
     # =========================
     
-    @staticmethod
-    def hex_to_rgb(color: str) -> Tuple[float, float, float]:
-        """Convert hex color or named color to RGB tuple (0-1 range)"""
-        NAMED_COLORS = {
-            "black": "#000000",
-            "white": "#ffffff",
-            "red": "#ff0000",
-            "green": "#00ff00",
-            "blue": "#0000ff",
-            "yellow": "#ffff00",
-            "cyan": "#00ffff",
-            "magenta": "#ff00ff",
-        }
-        if not color.startswith("#"):
-            color = NAMED_COLORS.get(color.lower(), "#000000")
-        color = color.lstrip("#")
-        return tuple(int(color[i : i + 2], 16) / 255 for i in (0, 2, 4))
+    # Pages typically use a handful of colors, so results are memoized
+    hex_to_rgb = staticmethod(_hex_to_rgb)
     
     # =========================
     # Coordinate conversion
@@ -79,122 +110,15 @@ class PdfAnnotationService:
     # =========================
     
     @staticmethod
-    def dot(ax: float, ay: float, bx: float, by: float) -> float:
-        """Dot product of two 2D vectors"""
-        return ax * bx + ay * by
+    def edge_aabbs(pts: np.ndarray) -> np.ndarray:
+        """Compute the (k - 1, 4) axis-aligned bounding boxes of a (k, 2) polyline's edges"""
+        return np.hstack((np.minimum(pts[:-1], pts[1:]), np.maximum(pts[:-1], pts[1:])))
     
     @staticmethod
-    def clamp01(t: float) -> float:
-        """Clamp value to [0, 1] range"""
-        return 0.0 if t < 0.0 else (1.0 if t > 1.0 else t)
-    
-    def closest_t_on_seg(
-        self, 
-        px: float, py: float, 
-        ax: float, ay: float, 
-        bx: float, by: float
-    ) -> float:
-        """Return t in [0,1] where segment AB is closest to point P"""
-        vx, vy = bx - ax, by - ay
-        denom = vx * vx + vy * vy
-        if denom == 0.0:
-            return 0.0
-        t = self.dot(px - ax, py - ay, vx, vy) / denom
-        return self.clamp01(t)
-    
-    def dist2_point_to_seg(
-        self,
-        px: float, py: float,
-        ax: float, ay: float,
-        bx: float, by: float
-    ) -> float:
-        """Squared distance from point P to segment AB"""
-        t = self.closest_t_on_seg(px, py, ax, ay, bx, by)
-        qx, qy = ax + t * (bx - ax), ay + t * (by - ay)
-        dx, dy = px - qx, py - qy
-        return dx * dx + dy * dy
-    
-    def dist2_seg_to_seg(
-        self,
-        ax: float, ay: float, bx: float, by: float,
-        cx: float, cy: float, dx: float, dy: float
-    ) -> float:
-        """
-        Min squared distance between segments AB and CD.
-        Robust implementation based on Ericson's closest points algorithm.
-        """
-        ux, uy = bx - ax, by - ay
-        vx, vy = dx - cx, dy - cy
-        wx, wy = ax - cx, ay - cy
-        
-        a = self.dot(ux, uy, ux, uy)  # always >= 0
-        b = self.dot(ux, uy, vx, vy)
-        c = self.dot(vx, vy, vx, vy)  # always >= 0
-        d = self.dot(ux, uy, wx, wy)
-        e = self.dot(vx, vy, wx, wy)
-        D = a * c - b * b  # always >= 0
-        
-        sc, sN, sD = D, D, D
-        tc, tN, tD = D, D, D
-        
-        if D < 1e-12:
-            # Lines almost parallel
-            sN = 0.0
-            sD = 1.0
-            tN = e
-            tD = c
-        else:
-            sN = (b * e - c * d)
-            tN = (a * e - b * d)
-            if sN < 0.0:
-                sN = 0.0
-                tN = e
-                tD = c
-            elif sN > sD:
-                sN = sD
-                tN = e + b
-                tD = c
-        
-        if tN < 0.0:
-            tN = 0.0
-            if -d < 0.0:
-                sN = 0.0
-            elif -d > a:
-                sN = sD
-            else:
-                sN = -d
-                sD = a
-        elif tN > tD:
-            tN = tD
-            if (-d + b) < 0.0:
-                sN = 0.0
-            elif (-d + b) > a:
-                sN = sD
-            else:
-                sN = (-d + b)
-                sD = a
-        
-        sc = 0.0 if abs(sN) < 1e-12 else (sN / sD)
-        tc = 0.0 if abs(tN) < 1e-12 else (tN / tD)
-        
-        # Closest points
-        cxA = ax + sc * ux
-        cyA = ay + sc * uy
-        cxB = cx + tc * vx
-        cyB = cy + tc * vy
-        dx, dy = cxA - cxB, cyA - cyB
-        return dx * dx + dy * dy
-    
-    @staticmethod
-    def aabb_inflate(aabb: Tuple[float, float, float, float], r: float) -> Tuple[float, float, float, float]:
-        """Inflate axis-aligned bounding box by radius r"""
-        minx, miny, maxx, maxy = aabb
-        return (minx - r, miny - r, maxx + r, maxy + r)
-    
-    @staticmethod
-    def seg_aabb(ax: float, ay: float, bx: float, by: float) -> Tuple[float, float, float, float]:
-        """Compute axis-aligned bounding box for segment"""
-        return (min(ax, bx), min(ay, by), max(ax, bx), max(ay, by))
+    def polyline_aabb(pts: np.ndarray) -> Tuple[float, float, float, float]:
+        """Compute axis-aligned bounding box for a (k, 2) polyline"""
+        (minx, miny), (maxx, maxy) = pts.min(axis=0).tolist(), pts.max(axis=0).tolist()
+        return (minx, miny, maxx, maxy)
     
     @staticmethod
     def aabb_overlap(a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> bool:
@@ -205,32 +129,71 @@ class PdfAnnotationService:
     # Capsule geometry
     # =========================
     
-    class Capsule:
-        """Represents a capsule (line segment with radius) for eraser detection"""
-        __slots__ = ("ax", "ay", "bx", "by", "r", "aabb")
+    @dataclass
+    class CapsuleBatch:
+        """Capsules of one eraser stroke stored column-wise (structure of arrays)"""
+        ax: np.ndarray
+        ay: np.ndarray
+        bx: np.ndarray
+        by: np.ndarray
+        r: np.ndarray
+        capsule_aabb: np.ndarray  # (N, 4) rows of minx, miny, maxx, maxy
+        max_r: float = 0.0  # largest radius, for inflating query AABBs
+        overall_aabb: Tuple[float, float, float, float] = EMPTY_AABB  # union of capsule_aabb
         
-        def __init__(self, ax: float, ay: float, bx: float, by: float, r: float):
-            self.ax, self.ay, self.bx, self.by, self.r = ax, ay, bx, by, r
-            self.aabb = PdfAnnotationService.aabb_inflate(
-                PdfAnnotationService.seg_aabb(ax, ay, bx, by), r
+        def __len__(self) -> int:
+            return len(self.ax)
+        
+        @classmethod
+        def from_arrays(
+            cls, ax: np.ndarray, ay: np.ndarray, bx: np.ndarray, by: np.ndarray, r: np.ndarray
+        ) -> "PdfAnnotationService.CapsuleBatch":
+            """Build a batch from centerline endpoint and radius columns, deriving the AABBs"""
+            capsule_aabb = np.column_stack((
+                np.minimum(ax, bx) - r,
+                np.minimum(ay, by) - r,
+                np.maximum(ax, bx) + r,
+                np.maximum(ay, by) + r,
+            ))
+            if not len(ax):
+                return cls(ax, ay, bx, by, r, capsule_aabb)
+            return cls(
+                ax, ay, bx, by, r, capsule_aabb,
+                max_r=float(r.max()),
+                overall_aabb=(
+                    *capsule_aabb[:, :2].min(axis=0).tolist(),
+                    *capsule_aabb[:, 2:].max(axis=0).tolist(),
+                ),
             )
     
-    def build_capsules(self, eraser_points_px: List[float], r: float) -> List[Capsule]:
-        """Build list of capsules from eraser polyline points"""
-        caps = []
-        pts = eraser_points_px
-        for i in range(0, len(pts) - 3, 2):
-            ax, ay = pts[i], pts[i + 1]
-            bx, by = pts[i + 2], pts[i + 3]
-            caps.append(self.Capsule(ax, ay, bx, by, r))
-        return caps
+    def build_capsules(self, eraser_points_px: np.ndarray, r: float) -> CapsuleBatch:
+        """
+        Build the capsule batch for an eraser polyline given as a (k, 2) array.
+        
+        Runs of samples within ERASER_WELD_TOLERANCE of one straight chord
+        (dense pointer samples along a gentle curve, jitter, repeats) are
+        welded into one capsule. A welded capsule's radius grows by the
+        tolerance so it still covers every sample pair it replaces; single
+        sample pairs keep radius r.
+        """
+        pts = np.ascontiguousarray(eraser_points_px, dtype=np.float64)
+        xs, ys = pts[:, 0].copy(), pts[:, 1].copy()
+        tol = self.ERASER_WELD_TOLERANCE
+        starts, ends = _weld_runs(xs, ys, tol * tol)
+        radii = np.where(ends - starts > 1, float(r) + tol, float(r))
+        return self.CapsuleBatch.from_arrays(xs[starts], ys[starts], xs[ends], ys[ends], radii)
     
     # =========================
     # Spatial indexing
     # =========================
     
     class UniformGrid:
-        """Spatial index using uniform grid for fast capsule AABB queries"""
+        """
+        Spatial index using uniform grid for fast capsule AABB queries.
+        
+        Cells are stored in CSR form: the capsule indices in cell c are
+        cell_items[cell_start[c]:cell_start[c + 1]].
+        """
         
         def __init__(self, minx: float, miny: float, maxx: float, maxy: float, cell: float):
             self.minx, self.miny = minx, miny
@@ -238,7 +201,11 @@ class PdfAnnotationService:
             nx = max(1, int((maxx - minx) / cell))
             ny = max(1, int((maxy - miny) / cell))
             self.nx, self.ny = nx, ny
-            self.buckets = [[] for _ in range(nx * ny)]
+            self.cell_start = np.zeros(nx * ny + 1, dtype=np.int32)
+            self.cell_items = np.empty(0, dtype=np.int32)
+            # Per-capsule dedup stamps; each query uses a fresh epoch value
+            self.stamp = np.zeros(0, dtype=np.int32)
+            self.epoch = 0
         
         def _ixiy(self, x: float, y: float) -> Tuple[int, int]:
             """Convert coordinates to grid indices"""
@@ -248,80 +215,66 @@ class PdfAnnotationService:
             iy = 0 if iy < 0 else (self.ny - 1 if iy >= self.ny else iy)
             return ix, iy
         
-        def insert_capsule(self, idx: int, aabb: Tuple[float, float, float, float]):
-            """Insert capsule index into grid cells overlapping its AABB"""
-            x0, y0, x1, y1 = aabb
-            ix0, iy0 = self._ixiy(x0, y0)
-            ix1, iy1 = self._ixiy(x1, y1)
-            for ix in range(ix0, ix1 + 1):
-                for iy in range(iy0, iy1 + 1):
-                    self.buckets[iy * self.nx + ix].append(idx)
+        def _ixiy_array(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            """Vectorized _ixiy"""
+            ix = ((x - self.minx) / self.cell).astype(np.int64)
+            iy = ((y - self.miny) / self.cell).astype(np.int64)
+            return np.clip(ix, 0, self.nx - 1), np.clip(iy, 0, self.ny - 1)
+        
+        def clear(self):
+            """Remove all capsules so the grid can be reused for the next eraser"""
+            self.cell_start.fill(0)
+            self.cell_items = self.cell_items[:0]
+        
+        def insert_capsule_batch(self, aabbs: np.ndarray):
+            """Index all capsule AABBs (N x 4 array of minx, miny, maxx, maxy) at once"""
+            ix0, iy0 = self._ixiy_array(aabbs[:, 0], aabbs[:, 1])
+            ix1, iy1 = self._ixiy_array(aabbs[:, 2], aabbs[:, 3])
+            w = ix1 - ix0 + 1
+            n_cells = w * (iy1 - iy0 + 1)
+            
+            # One (capsule, cell) pair per covered cell
+            owner = np.repeat(np.arange(len(aabbs), dtype=np.int32), n_cells)
+            offset = np.arange(owner.size) - np.repeat(np.cumsum(n_cells) - n_cells, n_cells)
+            w = w[owner]
+            flat_cells = (iy0[owner] + offset // w) * self.nx + ix0[owner] + offset % w
+            
+            counts = np.bincount(flat_cells, minlength=self.nx * self.ny)
+            np.cumsum(counts, out=self.cell_start[1:])
+            self.cell_items = owner[np.argsort(flat_cells, kind="stable")]
+            if len(self.stamp) < len(aabbs):
+                # Epochs only grow, so zeroed stamps never read as already seen
+                self.stamp = np.zeros(len(aabbs), dtype=np.int32)
         
-        def candidates_for_aabb(self, aabb: Tuple[float, float, float, float]):
-            """Yield candidate capsule indices for given AABB"""
+        def candidates_for_aabb(self, aabb: Tuple[float, float, float, float]) -> np.ndarray:
+            """Return unique candidate capsule indices for given AABB"""
             x0, y0, x1, y1 = aabb
             ix0, iy0 = self._ixiy(x0, y0)
             ix1, iy1 = self._ixiy(x1, y1)
-            seen = set()
-            for ix in range(ix0, ix1 + 1):
-                for iy in range(iy0, iy1 + 1):
-                    for idx in self.buckets[iy * self.nx + ix]:
-                        if idx not in seen:
-                            seen.add(idx)
-                            yield idx
+            self.epoch += 1
+            if self.epoch == np.iinfo(np.int32).max:
+                self.stamp.fill(0)
+                self.epoch = 1
+            return _csr_candidates(
+                self.cell_start, self.cell_items, self.nx,
+                ix0, iy0, ix1, iy1, self.stamp, self.epoch,
+            )
     
     # =========================
     # Eraser collision detection
     # =========================
     
-    def seg_capsule_dist2(
-        self,
-        ax: float, ay: float, bx: float, by: float,
-        cap: Capsule
-    ) -> float:
-        """
-        Squared distance from segment AB to capsule centerline, minus radius squared.
-        Returns <= 0 if segment intersects capsule.
-        """
-        d2 = self.dist2_seg_to_seg(ax, ay, bx, by, cap.ax, cap.ay, cap.bx, cap.by)
-        return d2 - cap.r * cap.r
-    
-    def seg_hits_any_capsule(
-        self,
-        ax: float, ay: float, bx: float, by: float,
-        capsules: List[Capsule],
-        grid: UniformGrid
-    ) -> bool:
-        """Check if segment AB hits any eraser capsule"""
-        aabb = self.seg_aabb(ax, ay, bx, by)
-        aabb = self.aabb_inflate(aabb, max(c.r for c in capsules) if capsules else 0.0)
-        for idx in grid.candidates_for_aabb(aabb):
-            cap = capsules[idx]
-            if self.aabb_overlap(aabb, cap.aabb):
-                if self.seg_capsule_dist2(ax, ay, bx, by, cap) <= 0.0:
-                    return True
-        return False
-    
-    def seg_distance2_to_eraser(
-        self,
-        ax: float, ay: float, bx: float, by: float,
-        capsules: List[Capsule],
-        grid: UniformGrid
-    ) -> float:
-        """
-        Return minimum (distance^2 - r^2) across all capsules.
-        Value <= 0 means segment is inside eraser.
-        """
-        best = float("inf")
-        aabb = self.aabb_inflate(self.seg_aabb(ax, ay, bx, by), 
-                                  max(c.r for c in capsules) if capsules else 0.0)
-        for idx in grid.candidates_for_aabb(aabb):
-            cap = capsules[idx]
-            if self.aabb_overlap(aabb, cap.aabb):
-                best = min(best, self.seg_capsule_dist2(ax, ay, bx, by, cap))
-                if best <= 0.0:
-                    return best
-        return best
+    @staticmethod
+    def _overlapping(
+        batch: CapsuleBatch,
+        idx: np.ndarray,
+        aabb: Tuple[float, float, float, float]
+    ) -> np.ndarray:
+        """Keep the candidates in idx whose capsule AABB overlaps aabb"""
+        box = batch.capsule_aabb[idx]
+        mask = (box[:, 2] >= aabb[0]) & (box[:, 0] <= aabb[2])
+        mask &= (box[:, 3] >= aabb[1]) & (box[:, 1] <= aabb[3])
+        return idx[mask]
     
     # =========================
     # Line splitting
@@ -331,128 +284,129 @@ class PdfAnnotationService:
         self,
         p0: Tuple[float, float],
         p1: Tuple[float, float],
-        capsules: List[Capsule],
+        capsules: CapsuleBatch,
         grid: UniformGrid,
-        max_iter: int = 18
-    ) -> List[Tuple[Tuple[float, float], Tuple[float, float]]]:
+        idx: Optional[np.ndarray] = None
+    ) -> Tuple[bool, bool, List[Tuple[Tuple[float, float], Tuple[float, float]]]]:
         """
-        Split a segment where it crosses eraser capsules using bisection.
-        Returns list of kept subsegments [(q0, q1), ...].
+        Split a segment where it crosses eraser capsules.
+        Entry/exit points are solved in closed form per candidate capsule.
+        Pass idx if the caller has already probed the grid for this segment.
+        Returns (start_kept, end_kept, pieces): whether the first piece starts
+        at p0, whether the last piece ends at p1, and the kept subsegments
+        [(q0, q1), ...].
         """
         x0, y0 = p0
         x1, y1 = p1
         
-        # Quick accept: entirely outside
-        if self.seg_distance2_to_eraser(x0, y0, x1, y1, capsules, grid) > 0.0:
-            return [(p0, p1)]
-        
-        # Check midpoint for quick rejection
-        mx, my = (x0 + x1) * 0.5, (y0 + y1) * 0.5
+        minx, miny, maxx, maxy = min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+        aabb = (minx, miny, maxx, maxy)
+        # Segments outside the whole eraser stroke never reach the grid
+        if not self.aabb_overlap(aabb, capsules.overall_aabb):
+            return True, True, [(p0, p1)]
+        if idx is None:
+            r = capsules.max_r
+            idx = grid.candidates_for_aabb((minx - r, miny - r, maxx + r, maxy + r))
+        idx = self._overlapping(capsules, idx, aabb)
+        if idx.size == 0:
+            return True, True, [(p0, p1)]
         
-        def inside_point(pt: Tuple[float, float]) -> bool:
-            x, y = pt
-            return self.seg_distance2_to_eraser(x, y, x, y, capsules, grid) <= 0.0
-        
-        a_inside = inside_point((x0, y0))
-        b_inside = inside_point((x1, y1))
-        
-        if a_inside and b_inside:
-            return []  # Fully erased
-        
-        def bisect_boundary(
-            a: Tuple[float, float], 
-            b: Tuple[float, float]
-        ) -> Tuple[float, float]:
-            """Find boundary point between inside and outside using bisection"""
-            ax, ay = a
-            bx, by = b
-            A_in = inside_point(a)
-            B_in = inside_point(b)
-            # Ensure A_outside, B_inside for consistency
-            if A_in and not B_in:
-                a, b = b, a
-                ax, ay = a
-                bx, by = b
-            lo = 0.0
-            hi = 1.0
-            for _ in range(max_iter):
-                t = (lo + hi) * 0.5
-                mx = ax + t * (bx - ax)
-                my = ay + t * (by - ay)
-                if inside_point((mx, my)):
-                    hi = t
-                else:
-                    lo = t
-            t = hi
-            return (ax + t * (bx - ax), ay + t * (by - ay))
-        
-        kept = []
-        if a_inside != b_inside:
-            # One in, one out -> clip to boundary
-            boundary = bisect_boundary((x0, y0), (x1, y1))
-            if a_inside:
-                kept.append((boundary, (x1, y1)))
-            else:
-                kept.append(((x0, y0), boundary))
-            return kept
-        
-        # Both outside, but may cross (enter+exit)
-        if not self.seg_hits_any_capsule(x0, y0, x1, y1, capsules, grid):
-            return [(p0, p1)]
-        
-        # Crossing: find enter and exit points
-        enter = bisect_boundary((x0, y0), (x1, y1))
-        exit_pt = bisect_boundary((x1, y1), (x0, y0))
-        kept.append(((x0, y0), enter))
-        kept.append((exit_pt, (x1, y1)))
-        return kept
+        kept = _kept_intervals(
+            x0, y0, x1, y1,
+            capsules.ax, capsules.ay, capsules.bx, capsules.by, capsules.r,
+            idx,
+        )
+        kept = kept.tolist()
+        dx, dy = x1 - x0, y1 - y0
+        pieces = []
+        for t0, t1 in kept:
+            # Keep untouched endpoints exact so polylines stitch back together
+            q0 = p0 if t0 == 0.0 else (x0 + t0 * dx, y0 + t0 * dy)
+            q1 = p1 if t1 == 1.0 else (x0 + t1 * dx, y0 + t1 * dy)
+            pieces.append((q0, q1))
+        start_kept = bool(kept) and kept[0][0] == 0.0
+        end_kept = bool(kept) and kept[-1][1] == 1.0
+        return start_kept, end_kept, pieces
     
-    def filter_line_by_eraser_px(
+    def filter_polyline_vectorized(
         self,
-        line_points_px: List[float],
-        eraser_capsules: List[Capsule],
+        pts: np.ndarray,
+        edge_aabbs: np.ndarray,
+        eraser_capsules: CapsuleBatch,
         grid: UniformGrid
-    ) -> List[List[float]]:
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
         """
-        Filter line polyline against eraser capsules.
-        Returns list of remaining line segments (each as flat [x0,y0,x1,y1,...]).
+        Filter a (k, 2) polyline with its (k - 1, 4) edge AABBs against eraser capsules.
+        Returns the remaining pieces as (points, edge_aabbs) pairs.
         """
-        if not eraser_capsules:
-            return [line_points_px]
-        
-        # Convert points to tuples
-        pts = [(line_points_px[i], line_points_px[i + 1]) 
-               for i in range(0, len(line_points_px), 2)]
-        out_segments: List[List[float]] = []
-        current: List[float] = []
+        if not len(eraser_capsules):
+            return [(pts, edge_aabbs)]
+        if len(pts) < 2:
+            return []
         
-        def flush_current():
-            nonlocal current
-            if len(current) >= 4:
-                out_segments.append(current)
-            current = []
+        # Only edges inside the eraser stroke's bounds are probed, with
+        # their AABBs inflated by the largest capsule radius
+        minx, miny, maxx, maxy = eraser_capsules.overall_aabb
+        near = np.flatnonzero(
+            (edge_aabbs[:, 0] <= maxx) & (edge_aabbs[:, 2] >= minx)
+            & (edge_aabbs[:, 1] <= maxy) & (edge_aabbs[:, 3] >= miny)
+        )
+        r = eraser_capsules.max_r
+        probes = (edge_aabbs[near] + (-r, -r, r, r)).tolist()
+        points = [tuple(p) for p in pts.tolist()]
         
-        for i in range(len(pts) - 1):
-            p0, p1 = pts[i], pts[i + 1]
-            pieces = self.split_segment_against_eraser(p0, p1, eraser_capsules, grid)
-            if not pieces:
-                # Fully erased - end current polyline
-                flush_current()
+        # Split only the edges the eraser touches
+        cut_pieces: Dict[int, Tuple[bool, bool, List[Tuple[Tuple[float, float], Tuple[float, float]]]]] = {}
+        for i, aabb in zip(near.tolist(), probes):
+            idx = grid.candidates_for_aabb(aabb)
+            if idx.size == 0:
                 continue
-            for (q0, q1) in pieces:
-                if not current:
-                    current.extend([q0[0], q0[1], q1[0], q1[1]])
-                else:
-                    # Check if continuous
-                    lastx, lasty = current[-2], current[-1]
-                    if abs(lastx - q0[0]) < 1e-6 and abs(lasty - q0[1]) < 1e-6:
-                        current.extend([q1[0], q1[1]])
-                    else:
-                        # Discontinuous - start new segment
-                        flush_current()
-                        current.extend([q0[0], q0[1], q1[0], q1[1]])
+            p0, p1 = points[i], points[i + 1]
+            start_kept, end_kept, pieces = self.split_segment_against_eraser(
+                p0, p1, eraser_capsules, grid, idx
+            )
+            if not (start_kept and end_kept and len(pieces) == 1):
+                cut_pieces[i] = (start_kept, end_kept, pieces)
+        
+        if not cut_pieces:
+            return [(pts, edge_aabbs)]
+        
+        out_segments: List[Tuple[np.ndarray, np.ndarray]] = []
+        
+        def flush(head: Optional[np.ndarray], lo: int, hi: int, tail: Optional[np.ndarray]):
+            """Emit head + pts[lo:hi] + tail, reusing the cached boxes of verbatim edges"""
+            parts = [part for part in (head, pts[lo:hi], tail) if part is not None]
+            run = np.concatenate(parts) if len(parts) > 1 else parts[0]
+            if len(run) < 2:
+                return
+            if hi == lo:
+                out_segments.append((run, self.edge_aabbs(run)))
+                return
+            boxes = [edge_aabbs[lo:hi - 1]]
+            if head is not None:
+                boxes.insert(0, self.edge_aabbs(run[:2]))
+            if tail is not None:
+                boxes.append(self.edge_aabbs(run[-2:]))
+            out_segments.append((run, np.concatenate(boxes) if len(boxes) > 1 else boxes[0]))
         
-        flush_current()
+        # Untouched vertices between cut edges are kept verbatim; the pieces
+        # of each cut edge close the run before it and open the run after it
+        lo = 0
+        head = None
+        for i, (start_kept, end_kept, pieces) in cut_pieces.items():
+            if start_kept:
+                flush(head, lo, i + 1, np.array([pieces[0][1]]))
+                pieces = pieces[1:]
+            else:
+                flush(head, lo, i, None)
+            head = None
+            if end_kept:
+                head = np.array([pieces[-1][0]])
+                pieces = pieces[:-1]
+            for q0, q1 in pieces:
+                flush(np.array([q0]), 0, 0, np.array([q1]))
+            lo = i + 1
+        flush(head, lo, len(pts), None)
         return out_segments
     
     # =========================
@@ -522,38 +476,54 @@ class PdfAnnotationService:
             
             # Store processed lines as polyline segments
             # Each entry: (stroke_color, stroke_width, segments_px)
-            # where segments_px is a list of line segments that survived erasure
-            processed_lines: List[Tuple[Tuple[float, float, float], float, List[List[float]]]] = []
+            # where segments_px is a list of Segment pieces that survived erasure
+            processed_lines: List[Tuple[Tuple[float, float, float], float, List[Segment]]] = []
+            
+            # All erasers on the page share r_px, so one spatial index is
+            # sized once and refilled per eraser stroke
+            grid = None
+            if erasers:
+                # Compile (or load from cache) the eraser kernels on first use
+                # rather than at import, so pages without erasers never pay for it
+                warm_up()
+                grid = self.UniformGrid(0.0, 0.0, page_width, page_height, max(8.0, r_px))
             
             # Process each line/eraser in order
             for line_item in lines:
                 tool = line_item.get("tool", "pencil")
                 pts = line_item["points"]
                 
-                # Convert points to page coordinates
-                pts_px: List[float] = []
-                for i in range(0, len(pts), 2):
-                    x, y = self.percentage_to_pdf_coords(pts[i], pts[i + 1], page_width, page_height)
-                    pts_px.extend([x, y])
+                # Convert percentage points to page coordinates
+                pts_px = np.asarray(pts, dtype=np.float64).reshape(-1, 2) * (
+                    page_width / 100, page_height / 100
+                )
                 
                 if tool == "fine-eraser":
                     # Build capsules for this eraser stroke
                     eraser_capsules = self.build_capsules(pts_px, r_px)
                     
-                    # Build spatial index for this eraser
-                    cell = max(8.0, r_px)
-                    grid = self.UniformGrid(0.0, 0.0, page_width, page_height, cell)
-                    for idx, cap in enumerate(eraser_capsules):
-                        grid.insert_capsule(idx, cap.aabb)
+                    # Index this eraser in the page grid
+                    grid.clear()
+                    grid.insert_capsule_batch(eraser_capsules.capsule_aabb)
                     
                     # Apply eraser to all previously processed lines
-                    updated_processed_lines: List[Tuple[Tuple[float, float, float], float, List[List[float]]]] = []
+                    eraser_aabb = eraser_capsules.overall_aabb
+                    updated_processed_lines: List[Tuple[Tuple[float, float, float], float, List[Segment]]] = []
                     for stroke_color, stroke_width, existing_segments in processed_lines:
                         new_segments = []
-                        for segment in existing_segments:
+                        for segment, edge_aabbs, segment_aabb in existing_segments:
+                            # Segments away from the eraser are kept as they are
+                            if not self.aabb_overlap(segment_aabb, eraser_aabb):
+                                new_segments.append((segment, edge_aabbs, segment_aabb))
+                                continue
                             # Apply eraser to this segment
-                            erased_segments = self.filter_line_by_eraser_px(segment, eraser_capsules, grid)
-                            new_segments.extend(erased_segments)
+                            erased_segments = self.filter_polyline_vectorized(
+                                segment, edge_aabbs, eraser_capsules, grid
+                            )
+                            new_segments.extend(
+                                (piece, piece_edges, self.polyline_aabb(piece))
+                                for piece, piece_edges in erased_segments
+                            )
                         
                         # Only keep the line if it still has segments after erasure
                         if new_segments:
@@ -566,35 +536,42 @@ class PdfAnnotationService:
                     # Regular line - add it to processed lines
                     stroke_color = self.hex_to_rgb(line_item["stroke"])
                     stroke_width = line_item["strokeWidth"]
-                    processed_lines.append((stroke_color, stroke_width, [pts_px]))
+                    if len(pts_px) >= 2:
+                        segment = (pts_px, self.edge_aabbs(pts_px), self.polyline_aabb(pts_px))
+                        processed_lines.append((stroke_color, stroke_width, [segment]))
             
-            # Draw all surviving line segments
-            for stroke_color, stroke_width, segments in processed_lines:
-                for segment_points in segments:
-                    if len(segment_points) < 4:
-                        continue
-                    # Draw polyline
-                    for i in range(0, len(segment_points) - 2, 2):
-                        x1, y1 = segment_points[i], segment_points[i + 1]
-                        x2, y2 = segment_points[i + 2], segment_points[i + 3]
-                        p1 = fitz.Point(x1, y1)
-                        p2 = fitz.Point(x2, y2)
-                        page.draw_line(p1, p2, color=stroke_color, width=stroke_width)
-                    # Draw round joints for smooth appearance
-                    for i in range(0, len(segment_points), 2):
-                        p = fitz.Point(segment_points[i], segment_points[i + 1])
-                        page.draw_circle(p, stroke_width * 0.25, color=stroke_color)
+            # Draw all surviving line segments. Each page.draw_* call rewrites
+            # the page contents, so draw into one shape per page. Only runs of
+            # consecutive same-style lines share a finish() so that later
+            # strokes still paint over earlier ones
+            shape = page.new_shape()
+            for (stroke_color, stroke_width), run in groupby(
+                processed_lines, key=lambda item: (item[0], round(item[1], 3))
+            ):
+                drawn = False
+                for _, _, segments in run:
+                    for segment_points, _, _ in segments:
+                        if len(segment_points) >= 2:
+                            # draw_polyline takes point-likes, so [x, y] rows need no fitz.Point
+                            shape.draw_polyline(segment_points.tolist())
+                            drawn = True
+                if drawn:
+                    # Round caps/joins give smooth strokes without per-vertex circles
+                    shape.finish(
+                        color=stroke_color, width=stroke_width,
+                        lineCap=1, lineJoin=1, closePath=False,
+                    )
+            shape.commit()
             
             # Draw text annotations
             texts = data.get("texts", [])
             for text in texts:
                 x, y = self.percentage_to_pdf_coords(text["x"], text["y"], page_width, page_height)
                 rect = fitz.Rect(x, y, x + 200, y + 50)
-                color = self.hex_to_rgb("red")
                 font_size = text["fontSize"]
                 content = text["text"]
                 self._debug_print(f"  Adding text '{content[:20]}...' at ({x:.1f}, {y:.1f})")
-                page.insert_textbox(rect, content, fontsize=font_size, color=color, align=0)
+                page.insert_textbox(rect, content, fontsize=font_size, color=self.TEXT_COLOR, align=0)
             
             # Draw sticky notes
             sticky_notes = data.get("stickyNotes", [])
@@ -3,51 +3,107 @@ Validation utilities for common entity checks.
 
 This module provides reusable validators that retrieve entities from the database
 and raise appropriate HTTPExceptions if they don't exist or access is denied.
+
+Models are imported inside the methods that query them, so importing this
+module (e.g. just for FileValidator) does not load the ORM model graph.
 """
 
-from typing import Optional
+from __future__ import annotations
+
+from contextvars import ContextVar
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Dict, Optional
 from uuid import UUID
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.constants import Messages, PrimaryRoles, CourseRoles, FileTypes
+
+if TYPE_CHECKING:
+    from app.models.assessment import Assessment
+    from app.models.course import Course
+    from app.models.question import Question
+    from app.models.user import User
+    from app.models.mark_query import MarkQuery
 
-from app.models.assessment import Assessment
-from app.models.course import Course
-from app.models.question import Question
-from app.models.user import User
-from app.models.uploaded_file import UploadedFile
-from app.models.mark_query import MarkQuery
-from app.core.constants import Messages, PrimaryRoles, CourseRoles
+# Per-request lookup cache, installed by the authorization cache middleware.
+# Holds "courses" (course_id -> Course) and "memberships"
+# (user_id -> {course_id: course_role_id}); None outside a request.
+auth_cache: ContextVar[Optional[Dict[str, Dict[Any, Any]]]] = ContextVar("auth_cache", default=None)
+
+
+def new_auth_cache() -> Dict[str, Dict[Any, Any]]:
+    """Create an empty per-request authorization cache."""
+    return {"courses": {}, "memberships": {}}
 
 
 class EntityValidator:
-    """Validator for retrieving entities with 404 handling."""
+    """
+    Validator for retrieving entities with 404 handling.
+    
+    Lookups go through Session.get, which returns objects already in the
+    session's identity map without a database round-trip.
+    """
     
     @staticmethod
     def get_assessment_or_404(db: Session, assessment_id: UUID) -> Assessment:
         """Get assessment by ID or raise 404."""
-        assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
+        from app.models.assessment import Assessment
+        
+        assessment = db.get(Assessment, assessment_id)
+        if not assessment:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=Messages.ASSESSMENT_NOT_FOUND
+            )
+        return assessment
+    
+    @staticmethod
+    def get_assessment_with_course_or_404(db: Session, assessment_id: UUID) -> Assessment:
+        """Get assessment by ID with its course loaded in the same SELECT, or raise 404."""
+        from app.models.assessment import Assessment
+        
+        assessment = (
+            db.query(Assessment)
+            .options(joinedload(Assessment.course))
+            .filter(Assessment.id == assessment_id)
+            .first()
+        )
         if not assessment:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=Messages.ASSESSMENT_NOT_FOUND
             )
+        cache = auth_cache.get()
+        if cache is not None:
+            cache["courses"][assessment.course_id] = assessment.course
         return assessment
     
     @staticmethod
     def get_course_or_404(db: Session, course_id: UUID) -> Course:
-        """Get course by ID or raise 404."""
-        course = db.query(Course).filter(Course.id == course_id).first()
+        """Get course by ID or raise 404. Reuses a course already fetched in this request."""
+        from app.models.course import Course
+        
+        cache = auth_cache.get()
+        if cache is not None and course_id in cache["courses"]:
+            return cache["courses"][course_id]
+        
+        course = db.get(Course, course_id)
         if not course:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=Messages.COURSE_NOT_FOUND
             )
+        if cache is not None:
+            cache["courses"][course_id] = course
         return course
     
     @staticmethod
     def get_question_or_404(db: Session, question_id: UUID) -> Question:
         """Get question by ID or raise 404."""
-        question = db.query(Question).filter(Question.id == question_id).first()
+        from app.models.question import Question
+        
+        question = db.get(Question, question_id)
         if not question:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -58,7 +114,9 @@ class EntityValidator:
     @staticmethod
     def get_user_or_404(db: Session, user_id: UUID) -> User:
         """Get user by ID or raise 404."""
-        user = db.query(User).filter(User.id == user_id).first()
+        from app.models.user import User
+        
+        user = db.get(User, user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -69,7 +127,9 @@ class EntityValidator:
     @staticmethod
     def get_mark_query_or_404(db: Session, query_id: UUID) -> MarkQuery:
         """Get mark query by ID or raise 404."""
-        mark_query = db.query(MarkQuery).filter(MarkQuery.id == query_id).first()
+        from app.models.mark_query import MarkQuery
+        
+        mark_query = db.get(MarkQuery, query_id)
         if not mark_query:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -78,65 +138,79 @@ class EntityValidator:
         return mark_query
 
 
+def role_bits(user: User) -> int:
+    """Return the user's primary role mask, as cached by get_current_user."""
+    bits = getattr(user, "_role_bits", None)
+    if bits is None:
+        bits = user._role_bits = 1 << user.primary_role_id
+    return bits
+
+
+def admin_bypass(check):
+    """Decorate a (db, user, course_id) access check so administrators always pass."""
+    @wraps(check)
+    def wrapper(db: Session, user: User, course_id: UUID) -> None:
+        # Admins have access to everything
+        if role_bits(user) & PrimaryRoles.ADMINISTRATOR_BIT:
+            return
+        check(db, user, course_id)
+    return wrapper
+
+
 class AccessValidator:
-    """Validator for checking user access permissions."""
+    """
+    Validator for checking user access permissions.
+    
+    Course roles are read from user.course_roles, which get_current_user
+    eager-loads, so the checks below run in memory without a query.
+    """
+    
+    @staticmethod
+    def _course_role_id(user: User, course_id: UUID) -> Optional[int]:
+        """
+        Return the user's role id in a course, or None if not enrolled.
+        Within a request, the user's memberships are indexed by course once.
+        """
+        cache = auth_cache.get()
+        if cache is None:
+            memberships = {role.course_id: role.course_role_id for role in user.course_roles}
+        else:
+            memberships = cache["memberships"].get(user.id)
+            if memberships is None:
+                memberships = {role.course_id: role.course_role_id for role in user.course_roles}
+                cache["memberships"][user.id] = memberships
+        return memberships.get(course_id)
     
     @staticmethod
+    @admin_bypass
     def validate_course_access(db: Session, user: User, course_id: UUID) -> None:
         """
         Validate that user has access to a course.
         Raises HTTPException if access is denied.
         """
-        # Admins have access to everything
-        if user.primary_role_id == PrimaryRoles.ADMINISTRATOR:
-            return
-        
         # Check if user has any role in the course
-        from app.models.user_course_role import UserCourseRole
-        user_role = (
-            db.query(UserCourseRole)
-            .filter(
-                UserCourseRole.user_id == user.id,
-                UserCourseRole.course_id == course_id
-            )
-            .first()
-        )
-        
-        if not user_role:
+        if AccessValidator._course_role_id(user, course_id) is None:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=Messages.COURSE_ACCESS_DENIED
             )
     
     @staticmethod
+    @admin_bypass
     def validate_convener_access(db: Session, user: User, course_id: UUID) -> None:
         """
         Validate that user is a course convener.
         Raises HTTPException if not a convener.
         """
-        # Admins have access to everything
-        if user.primary_role_id == PrimaryRoles.ADMINISTRATOR:
-            return
-        
         # Check if user is convener
-        from app.models.user_course_role import UserCourseRole
-        convener_role = (
-            db.query(UserCourseRole)
-            .filter(
-                UserCourseRole.user_id == user.id,
-                UserCourseRole.course_id == course_id,
-                UserCourseRole.course_role_id == CourseRoles.CONVENER
-            )
-            .first()
-        )
-        
-        if not convener_role:
+        if AccessValidator._course_role_id(user, course_id) != CourseRoles.CONVENER:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=Messages.CONVENER_REQUIRED
             )
     
     @staticmethod
+    @admin_bypass
     def validate_facilitator_or_convener_access(
         db: Session, user: User, course_id: UUID
     ) -> None:
@@ -144,26 +218,9 @@ class AccessValidator:
         Validate that user is a facilitator or convener.
         Raises HTTPException if neither.
         """
-        # Admins have access to everything
-        if user.primary_role_id == PrimaryRoles.ADMINISTRATOR:
-            return
-        
         # Check if user is facilitator or convener
-        from app.models.user_course_role import UserCourseRole
-        role = (
-            db.query(UserCourseRole)
-            .filter(
-                UserCourseRole.user_id == user.id,
-                UserCourseRole.course_id == course_id,
-                UserCourseRole.course_role_id.in_([
-                    CourseRoles.CONVENER,
-                    CourseRoles.FACILITATOR
-                ])
-            )
-            .first()
-        )
-        
-        if not role:
+        role_id = AccessValidator._course_role_id(user, course_id)
+        if role_id not in (CourseRoles.CONVENER, CourseRoles.FACILITATOR):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=Messages.FACILITATOR_OR_CONVENER_REQUIRED
@@ -186,7 +243,8 @@ class FileValidator:
     @staticmethod
     def validate_pdf_file(filename: str) -> None:
         """Validate that file is a PDF."""
-        if not filename.lower().endswith('.pdf'):
+        # Only the extension is lower-cased, not the whole filename
+        if filename[-4:].lower() != '.pdf':
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=Messages.PDF_ONLY
@@ -195,7 +253,7 @@ class FileValidator:
     @staticmethod
     def validate_csv_file(content_type: str) -> None:
         """Validate that file is a CSV."""
-        if content_type != "text/csv":
+        if content_type != FileTypes.CSV:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=Messages.CSV_ONLY
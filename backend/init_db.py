@@ -25,32 +25,40 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def wait_for_db(max_retries: int = 30, retry_interval: int = 2) -> bool:
+def wait_for_db(max_retries: int = 30, base_delay: float = 0.5, max_delay: float = 30.0) -> bool:
     """
     Wait for the database to be available.
     
+    One engine is reused across attempts, and the wait between attempts
+    doubles from base_delay up to max_delay.
+    
     Args:
         max_retries: Maximum number of connection attempts
-        retry_interval: Seconds to wait between attempts
+        base_delay: Seconds to wait after the first failed attempt
+        max_delay: Upper bound on the wait between attempts
         
     Returns:
         True if database is available, False otherwise
     """
     logger.info(f"Waiting for database at {settings.DATABASE_URL}")
     
-    for attempt in range(max_retries):
-        try:
-            engine = create_engine(settings.DATABASE_URL)
-            with engine.connect() as conn:
-                # Try a simple query
-                conn.execute(text("SELECT 1"))
-            logger.info("Database is available!")
-            return True
-            
-        except OperationalError as e:
-            logger.warning(f"Database not ready (attempt {attempt + 1}/{max_retries}): {e}")
-            if attempt < max_retries - 1:
-                time.sleep(retry_interval)
+    connect_args = {} if settings.DATABASE_URL.startswith("sqlite") else {"connect_timeout": 2}
+    engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, connect_args=connect_args)
+    try:
+        for attempt in range(max_retries):
+            try:
+                with engine.connect() as conn:
+                    # Try a simple query
+                    conn.execute(text("SELECT 1"))
+                logger.info("Database is available!")
+                return True
+                
+            except OperationalError as e:
+                logger.warning(f"Database not ready (attempt {attempt + 1}/{max_retries}): {e}")
+                if attempt < max_retries - 1:
+                    time.sleep(min(max_delay, base_delay * 2 ** attempt))
+    finally:
+        engine.dispose()
             
     logger.error("Database is not available after maximum retries")
     return False
@@ -17,9 +17,9 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from alembic.config import Config
 from alembic import command
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import MetaData
 
-from app.core.config import settings
+from app.db.session import engine
 
 
 def init_db():
@@ -63,8 +63,6 @@ def reset_db():
     
     print("Resetting database...")
     
-    engine = create_engine(settings.DATABASE_URL)
-    
     # Drop all tables
     metadata = MetaData()
     metadata.reflect(bind=engine)
@@ -12,10 +12,12 @@ from pathlib import Path
 # Add the current directory to Python path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
-from app.core.config import settings
+from app.db.session import engine
 from app.models.user import User
 from app.core.security import hash_password
 
@@ -23,6 +25,32 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def existing_keys(db: Session, model, key: str, values: list) -> set:
+    """Return which of the given key values already exist, in one SELECT."""
+    column = getattr(model, key)
+    return set(db.scalars(select(column).where(column.in_(values))))
+
+
+def insert_missing(db: Session, model, rows: list, key: str) -> list:
+    """
+    Insert rows in a single statement, skipping rows whose key already exists.
+    
+    Returns:
+        Key values of the rows that were inserted
+    """
+    if not rows:
+        return []
+    insert = sqlite_insert if db.get_bind().dialect.name == "sqlite" else pg_insert
+    column = getattr(model, key)
+    stmt = (
+        insert(model)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[key])
+        .returning(column)
+    )
+    return list(db.scalars(stmt))
+
+
 def seed_roles(db: Session) -> dict:
     """Seed initial roles into the database."""
     logger.info("Seeding roles...")
@@ -38,14 +66,14 @@ def seed_roles(db: Session) -> dict:
     ]
     
     # Create primary roles if they don't exist
+    existing = existing_keys(db, PrimaryRole, "id", [r["id"] for r in primary_roles_data])
+    missing = [r for r in primary_roles_data if r["id"] not in existing]
+    created = set(insert_missing(db, PrimaryRole, missing, "id"))
     for role_data in primary_roles_data:
-        existing_role = db.query(PrimaryRole).filter(PrimaryRole.id == role_data["id"]).first()
-        if not existing_role:
-            role = PrimaryRole(id=role_data["id"], name=role_data["name"])
-            db.add(role)
+        if role_data["id"] in created:
             logger.info(f"Created primary role: {role_data['name']} (ID: {role_data['id']})")
         else:
-            logger.info(f"Primary role already exists: {existing_role.name}")
+            logger.info(f"Primary role already exists: {role_data['name']}")
     
     # Define the course roles
     course_roles_data = [
@@ -55,14 +83,14 @@ def seed_roles(db: Session) -> dict:
     ]
     
     # Create course roles if they don't exist
+    existing = existing_keys(db, CourseRole, "id", [r["id"] for r in course_roles_data])
+    missing = [r for r in course_roles_data if r["id"] not in existing]
+    created = set(insert_missing(db, CourseRole, missing, "id"))
     for role_data in course_roles_data:
-        existing_role = db.query(CourseRole).filter(CourseRole.id == role_data["id"]).first()
-        if not existing_role:
-            role = CourseRole(id=role_data["id"], name=role_data["name"])
-            db.add(role)
+        if role_data["id"] in created:
             logger.info(f"Created course role: {role_data['name']} (ID: {role_data['id']})")
         else:
-            logger.info(f"Course role already exists: {existing_role.name}")
+            logger.info(f"Course role already exists: {role_data['name']}")
     
     db.commit()
     
@@ -139,26 +167,34 @@ def seed_users(db: Session) -> None:
         }
     ]
     
+    # One SELECT finds the users that already exist, so only new ones are hashed
+    existing = existing_keys(db, User, "email", [u["email"] for u in test_users])
+    new_users = [u for u in test_users if u["email"] not in existing]
+    
+    # Hash each distinct password once; the test users share them by role
+    hashes = {password: hash_password(password) for password in {u["password"] for u in new_users}}
+    
+    # Insert the new users in one statement; ON CONFLICT still guards against races
+    payload = [
+        {
+            "first_name": user_data["first_name"],
+            "last_name": user_data["last_name"],
+            "email": user_data["email"],
+            "student_number": user_data.get("student_number"),
+            "password_hash": hashes[user_data["password"]],
+            "is_admin": user_data["is_admin"],
+            "primary_role_id": user_data["primary_role_id"],
+        }
+        for user_data in new_users
+    ]
+    created = set(insert_missing(db, User, payload, "email"))
+    
+    role_names = {1: "Administrator", 2: "Staff", 3: "Student"}
     for user_data in test_users:
-        # Check if user already exists
-        existing_user = db.query(User).filter(User.email == user_data["email"]).first()
-        
-        if not existing_user:
-            user = User(
-                first_name=user_data["first_name"],
-                last_name=user_data["last_name"],
-                email=user_data["email"],
-                student_number=user_data.get("student_number"),
-                password_hash=hash_password(user_data["password"]),
-                is_admin=user_data["is_admin"],
-                primary_role_id=user_data["primary_role_id"]
-            )
-            
-            db.add(user)
-            role_names = {1: "Administrator", 2: "Staff", 3: "Student"}
+        if user_data["email"] in created:
             logger.info(f"Created user: {user_data['email']} ({role_names[user_data['primary_role_id']]})")
         else:
-            logger.info(f"User already exists: {existing_user.email}")
+            logger.info(f"User already exists: {user_data['email']}")
     
     db.commit()
     logger.info("Test user seeding completed!")
@@ -169,9 +205,7 @@ def main():
     logger.info("Starting database seeding...")
     
     try:
-        # Create database engine and session
-        engine = create_engine(settings.DATABASE_URL)
-        
+        # Use the application's shared engine
         with Session(engine) as db:
             # Seed roles
             seed_roles(db)
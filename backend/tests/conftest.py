@@ -1,10 +1,40 @@
 """
 Root conftest to ensure backend/app is importable from tests/pytests/
 """
+import atexit
+import os
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 
+# Keep the app's own engine off disk during tests (its default is ./test.db);
+# the tests run against the in-memory engine built in tests/pytests/conftest.py
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+# Anything the app still writes to disk (storage folders are created when the
+# routers import) goes to a throwaway directory instead of backend/storage/.
+# Set TMPDIR=/dev/shm to keep it in memory on Linux.
+_storage_root = Path(tempfile.mkdtemp(prefix="openassess-tests-"))
+atexit.register(shutil.rmtree, _storage_root, ignore_errors=True)
+for _setting, _folder in {
+    "JSON_STORAGE_PATH": "json",
+    "QUESTION_PAPER_STORAGE_FOLDER": "pdfs/question_papers",
+    "ANSWER_SHEET_STORAGE_FOLDER": "pdfs/answer_sheets",
+    "ANNOTATION_STORAGE_FOLDER": "jsons/annotations",
+}.items():
+    os.environ.setdefault(_setting, str(_storage_root / _folder))
+
 # Add backend directory to Python path so 'app' module can be imported
 backend_dir = Path(__file__).parent.parent
 if str(backend_dir) not in sys.path:
     sys.path.insert(0, str(backend_dir))
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--reuse-db",
+        action="store_true",
+        help="Keep the schema of an existing file-backed SQLite test database "
+        "instead of rebuilding it",
+    )
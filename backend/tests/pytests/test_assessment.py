@@ -1,6 +1,13 @@
-import tempfile
-from pathlib import Path
-from .conftest import auth_headers
+import csv
+import io
+import uuid
+
+from app.core.constants import PrimaryRoles
+from app.models.assessment import Assessment
+from app.models.question import Question
+from app.models.question_result import QuestionResult
+from app.models.user import User
+from .conftest import auth_headers, ok
 
 
 def test_create_assessment(client, course, teacher):
@@ -14,8 +21,7 @@ def test_create_assessment(client, course, teacher):
         },
         headers=headers,
     )
-    assert response.status_code == 200
-    data = response.json()
+    data = ok(response)
     assert data["title"] == "Midterm Exam"
     assert data["course_id"] == str(course.id)
 
@@ -40,71 +46,80 @@ def test_update_assessment(client, assessment, teacher):
     assert response.json()["title"] == "Updated Exam"
 
 
-def test_delete_assessment(client, assessment, teacher):
+def test_delete_assessment(client, db_session, assessment, teacher):
     headers = auth_headers(teacher)
     response = client.delete(f"/api/v1/assessments/{assessment.id}", headers=headers)
     assert response.status_code == 200
     assert response.json()["message"] == "Assessment deleted"
 
-    follow_up = client.get(f"/api/v1/assessments/{assessment.id}", headers=headers)
-    assert follow_up.status_code == 404
+    assert db_session.get(Assessment, assessment.id) is None
 
 
-def test_upload_assessment_with_pdf(client, course, teacher):
+def test_upload_assessment_with_pdf(client, course, teacher, pdf_bytes):
     headers = auth_headers(teacher)
-    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-        tmp.write(b"%PDF-1.4\n%Test PDF content\n%%EOF")
-        tmp_path = tmp.name
-
-    with open(tmp_path, "rb") as pdf_file:
-        response = client.post(
-            "/api/v1/assessments/upload",
-            data={"title": "Midterm", "course_id": str(course.id)},
-            files={"file": ("midterm.pdf", pdf_file, "application/pdf")},
-            headers=headers,
-        )
-
-    Path(tmp_path).unlink()
+    response = client.post(
+        "/api/v1/assessments/upload",
+        data={"title": "Midterm", "course_id": str(course.id)},
+        files={"file": ("midterm.pdf", pdf_bytes, "application/pdf")},
+        headers=headers,
+    )
 
-    assert response.status_code == 200, response.text
-    data = response.json()
+    data = ok(response)
     assert data["title"] == "Midterm"
     assert data["course_id"] == str(course.id)
     assert data["question_paper_file_path"].endswith(".pdf")
 
-    stored_path = Path(data["question_paper_file_path"])
-    if stored_path.exists():
-        stored_path.unlink()
-
 
-def test_download_assessment_question_paper(client, course, teacher):
+def test_download_assessment_question_paper(client, course, teacher, pdf_bytes):
     headers = auth_headers(teacher)
-    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-        tmp.write(b"%PDF-1.4\nTest question paper")
-        tmp_path = tmp.name
-
-    try:
-        with open(tmp_path, "rb") as f:
-            upload_response = client.post(
-                "/api/v1/assessments/upload",
-                data={"title": "Final Exam", "course_id": str(course.id)},
-                files={"file": ("exam.pdf", f, "application/pdf")},
-                headers=headers,
-            )
-
-        assert upload_response.status_code == 200
-        assessment_id = upload_response.json()["id"]
-
-        response = client.get(
-            f"/api/v1/assessments/{assessment_id}/question-paper", headers=headers
-        )
-        assert response.status_code == 200
-        assert response.headers["content-type"] == "application/pdf"
-        assert b"%PDF-1.4" in response.content
-
-        path = Path(upload_response.json()["question_paper_file_path"])
-        if path.exists():
-            path.unlink()
-
-    finally:
-        Path(tmp_path).unlink()
+    upload_response = client.post(
+        "/api/v1/assessments/upload",
+        data={"title": "Final Exam", "course_id": str(course.id)},
+        files={"file": ("exam.pdf", pdf_bytes, "application/pdf")},
+        headers=headers,
+    )
+
+    assessment_id = ok(upload_response)["id"]
+
+    response = client.get(
+        f"/api/v1/assessments/{assessment_id}/question-paper", headers=headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert b"%PDF-1.4" in response.content
+
+
+def test_download_results_csv_unmarked_cells(
+    client, db_session, assessment, question, question_result, teacher, marker
+):
+    """Unmarked questions and all-unmarked totals export as 0, not 0.0"""
+    second = Question(
+        id=uuid.uuid4(), assessment_id=assessment.id, question_number="2",
+        max_marks=5.0, increment=0.5, page_number=2,
+    )
+    unmarked_student = User(
+        id=uuid.uuid4(), first_name="Other", last_name="Student",
+        email="other.student@example.com", student_number="S654321",
+        password_hash="x", primary_role_id=PrimaryRoles.STUDENT,
+    )
+    db_session.add_all([second, unmarked_student])
+    db_session.flush()
+    # An annotation-only save leaves the mark empty
+    db_session.add(QuestionResult(
+        id=uuid.uuid4(), student_id=unmarked_student.id, assessment_id=assessment.id,
+        question_id=question.id, marker_id=marker.id, mark=None,
+    ))
+    db_session.flush()
+
+    response = client.get(
+        f"/api/v1/assessments/{assessment.id}/results/download",
+        headers=auth_headers(teacher),
+    )
+
+    assert response.status_code == 200, response.text
+    header, *rows = csv.reader(io.StringIO(response.text))
+    assert header == ["student_number", "first_name", "last_name", " 1", " 2", "total"]
+    assert sorted(rows) == [
+        ["S123456", "Test", "Student", "7.5", "0", "7.5"],
+        ["S654321", "Other", "Student", "0", "0", "0"],
+    ]
@@ -1,3 +1,6 @@
+from .conftest import ok
+
+
 def test_signup_success(client, db_session):
     response = client.post(
         "/api/v1/auth/signup",
@@ -10,8 +13,7 @@ def test_signup_success(client, db_session):
             "primary_role_id": 3,
         },
     )
-    assert response.status_code == 200
-    data = response.json()
+    data = ok(response)
     assert data["email"] == "newuser@example.com"
     assert "id" in data
 
@@ -40,8 +42,7 @@ def test_login_success(client, student):
             "password": "studentpass",
         },
     )
-    assert response.status_code == 200
-    data = response.json()
+    data = ok(response)
     assert "access_token" in data
     assert data["token_type"] == "bearer"
 
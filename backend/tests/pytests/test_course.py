@@ -1,6 +1,16 @@
+import uuid
+
+import pytest
+
+from app.core.constants import CourseRoles
+from app.models.assessment import Assessment
+from app.models.course import Course
+from app.models.question import Question
+from app.models.user_course_role import UserCourseRole
 from .conftest import auth_headers
 
 
+@pytest.mark.slow
 def test_create_course(client, teacher):
     headers = auth_headers(teacher)
     response = client.post(
@@ -19,6 +29,7 @@ def test_create_course(client, teacher):
     assert data["teacher_id"] == str(teacher.id)
 
 
+@pytest.mark.slow
 def test_get_course_by_id(client, course, teacher):
     headers = auth_headers(teacher)
     response = client.get(f"/api/v1/courses/{course.id}", headers=headers)
@@ -28,6 +39,7 @@ def test_get_course_by_id(client, course, teacher):
     assert data["title"] == course.title
 
 
+@pytest.mark.slow
 def test_update_course(client, course, teacher):
     headers = auth_headers(teacher)
     response = client.patch(
@@ -39,14 +51,14 @@ def test_update_course(client, course, teacher):
     assert response.json()["title"] == "Computer Science 244"
 
 
-def test_delete_course(client, course, teacher):
+@pytest.mark.slow
+def test_delete_course(client, db_session, course, teacher):
     headers = auth_headers(teacher)
     response = client.delete(f"/api/v1/courses/{course.id}", headers=headers)
     assert response.status_code == 200
     assert response.json()["message"] == "Course deleted"
 
-    follow_up = client.get(f"/api/v1/courses/{course.id}", headers=headers)
-    assert follow_up.status_code == 404
+    assert db_session.get(Course, course.id) is None
 
 
 def test_student_cannot_create_course(client, student):
@@ -61,3 +73,65 @@ def test_student_cannot_create_course(client, student):
         headers=headers,
     )
     assert response.status_code == 403
+
+
+def test_course_stats_with_several_assessments(
+    client, db_session, course, teacher, student, uploaded_file, question_result
+):
+    # A second, empty assessment next to the one the fixtures fill in
+    empty = Assessment(id=uuid.uuid4(), title="Empty Assessment", course_id=course.id)
+    student.course_roles.append(
+        UserCourseRole(course_id=course.id, course_role_id=CourseRoles.STUDENT)
+    )
+    db_session.add(empty)
+    db_session.flush()
+
+    response = client.get(f"/api/v1/courses/{course.id}/stats", headers=auth_headers(teacher))
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["totalStudents"] == 1
+    assert data["averagePerformance"] == 75.0
+    stats = {a["id"]: a for a in data["assessments"]}
+    assert stats[str(question_result.assessment_id)] == {
+        "id": str(question_result.assessment_id),
+        "title": "Test Assessment",
+        "published": False,
+        "totalQuestions": 1,
+        "totalStudents": 1,
+        "questionsMarked": 1,
+        "questionsCompletelyMarked": 1,
+        "averageScore": 75.0,
+        "submissionCount": 1,
+        "queryCount": 0,
+    }
+    assert stats[str(empty.id)]["totalQuestions"] == 0
+    assert stats[str(empty.id)]["averageScore"] == 0.0
+
+
+def test_course_stats_without_enrolled_students(
+    client, db_session, course, teacher, uploaded_file, question_result
+):
+    # Results and uploads outlive the student's enrollment, and question
+    # counts don't depend on enrollment at all
+    unmarked = Assessment(id=uuid.uuid4(), title="Unmarked Assessment", course_id=course.id)
+    db_session.add(unmarked)
+    db_session.flush()
+    db_session.add(Question(
+        id=uuid.uuid4(), assessment_id=unmarked.id, question_number="1",
+        max_marks=5.0, increment=0.5, page_number=1,
+    ))
+    db_session.flush()
+
+    response = client.get(f"/api/v1/courses/{course.id}/stats", headers=auth_headers(teacher))
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["totalStudents"] == 0
+    assert data["averagePerformance"] == 75.0
+    stats = {a["id"]: a for a in data["assessments"]}
+    graded = stats[str(question_result.assessment_id)]
+    assert (graded["totalQuestions"], graded["submissionCount"], graded["questionsMarked"]) == (1, 1, 1)
+    assert graded["averageScore"] == 75.0
+    assert stats[str(unmarked.id)]["totalQuestions"] == 1
+    assert stats[str(unmarked.id)]["submissionCount"] == 0
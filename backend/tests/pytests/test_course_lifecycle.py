@@ -0,0 +1,34 @@
+from .conftest import auth_headers, ok
+
+
+def test_course_lifecycle(client, teacher):
+    """Create, read, update and delete one course through the API"""
+    headers = auth_headers(teacher)
+
+    created = ok(
+        client.post(
+            "/api/v1/courses/",
+            json={
+                "title": "Computer Science",
+                "teacher_id": str(teacher.id),
+                "code": "244",
+            },
+            headers=headers,
+        )
+    )
+    assert created["title"] == "Computer Science"
+    assert created["code"] == "244"
+    assert created["teacher_id"] == str(teacher.id)
+    course_url = f"/api/v1/courses/{created['id']}"
+
+    fetched = ok(client.get(course_url, headers=headers))
+    assert fetched["id"] == created["id"]
+    assert fetched["title"] == "Computer Science"
+
+    updated = ok(
+        client.patch(course_url, json={"title": "Computer Science 244"}, headers=headers)
+    )
+    assert updated["title"] == "Computer Science 244"
+
+    assert ok(client.delete(course_url, headers=headers))["message"] == "Course deleted"
+    assert client.get(course_url, headers=headers).status_code == 404
@@ -1,202 +1,91 @@
-from unittest.mock import patch, MagicMock
-from pathlib import Path
+import io
 import json
+import zipfile
+from types import MappingProxyType
 
+import pytest
 
-def test_export_annotated_pdfs_success(client):
-    """Test successful export of annotated PDFs"""
-    
-    # Mock the necessary data and functions
-    with patch("app.core.config.settings") as mock_settings, \
-         patch("app.routers.export.zipfile.ZipFile"), \
-         patch("app.routers.export.tempfile.mkdtemp") as mock_mkdtemp, \
-         patch("app.routers.export.Path") as mock_path, \
-         patch("app.services.pdf_annotation_service.pdf_annotation_service.burn_annotations_to_pdf"), \
-         patch("app.routers.export.FileResponse"):
+from app.core.config import get_settings, settings
+from app.routers.export import get_pdf_annotation_service
 
-        # Setup mocks
-        mock_temp_dir = Path("/tmp/test")
-        mock_mkdtemp.return_value = str(mock_temp_dir)
 
-        # Mock settings paths
-        mock_settings.ANSWER_SHEET_STORAGE_FOLDER = Path("/answers")
-        mock_settings.ANNOTATION_STORAGE_FOLDER = Path("/annotations")
+REQUEST_DATA = MappingProxyType(
+    {
+        "course_id": "550e8400-e29b-41d4-a716-446655440000",
+        "assessment_id": "550e8400-e29b-41d4-a716-446655440001",
+    }
+)
+# Encoded once; json.dumps can't take the read-only mapping itself
+REQUEST_BODY = json.dumps(dict(REQUEST_DATA)).encode()
+JSON_HEADERS = MappingProxyType({"Content-Type": "application/json"})
 
-        # Mock path operations
-        mock_answer_folder = MagicMock()
-        mock_answer_folder.exists.return_value = True
-        mock_answer_folder.glob.return_value = [Path("/answers/student1.pdf")]
 
-        mock_annotation_folder = MagicMock()
-        mock_annotation_folder.exists.return_value = True
+class FakeAnnotationService:
+    """Records burn requests and writes a placeholder PDF in place of the real render"""
 
-        mock_student_annotation_dir = MagicMock()
-        mock_student_annotation_dir.exists.return_value = True
-        mock_student_annotation_dir.glob.return_value = [Path("/annotations/student1/page_1.json")]
+    def __init__(self):
+        self.calls = []
 
-        def mock_path_constructor(path_str):
-            if "answers" in str(path_str):
-                return mock_answer_folder
-            elif "annotations" in str(path_str) and "student1" in str(path_str):
-                return mock_student_annotation_dir
-            elif "annotations" in str(path_str):
-                return mock_annotation_folder
-            return MagicMock()
+    def burn_annotations_to_pdf(self, input_pdf_path, output_pdf_path, annotations):
+        self.calls.append((input_pdf_path, annotations))
+        with open(output_pdf_path, "wb") as f:
+            f.write(b"%PDF-1.4\n%%EOF")
 
-        mock_path.side_effect = mock_path_constructor
 
-        # Mock file reading
-        with patch("builtins.open", create=True):
-            # Mock json.load
-            with patch("json.load") as mock_json_load:
-                mock_json_load.return_value = {
-                    "page": 1,
-                    "data": {
-                        "lines": [],
-                        "texts": [],
-                        "stickyNotes": []
-                    }
-                }
-
-                request_data = {
-                    "course_id": "550e8400-e29b-41d4-a716-446655440000",
-                    "assessment_id": "550e8400-e29b-41d4-a716-446655440001"
-                }
-
-                response = client.post("/api/v1/export/annotated-pdfs", json=request_data)
-
-                # Since this endpoint doesn't require auth and we're fully mocking,
-                # we might get different responses. Let's just check it doesn't crash
-                assert response.status_code in [200, 404, 500]
-
-
-def test_export_annotated_pdfs_answer_folder_not_found(client):
-    """Test export when answer folder doesn't exist"""
-    
-    with patch("app.core.config.settings") as mock_settings, \
-         patch("app.routers.export.Path") as mock_path:
-
-        # Mock settings paths
-        mock_settings.ANSWER_SHEET_STORAGE_FOLDER = Path("/answers")
-        mock_settings.ANNOTATION_STORAGE_FOLDER = Path("/annotations")
-
-        # Mock answer folder doesn't exist
-        mock_answer_folder = MagicMock()
-        mock_answer_folder.exists.return_value = False
-
-        mock_path.return_value = mock_answer_folder
-
-        request_data = {
-            "course_id": "550e8400-e29b-41d4-a716-446655440000",
-            "assessment_id": "550e8400-e29b-41d4-a716-446655440001"
+@pytest.fixture
+def export_env(client, tmp_path):
+    """Point the export route at storage folders under tmp_path"""
+    fake_settings = settings.model_copy(
+        update={
+            "ANSWER_SHEET_STORAGE_FOLDER": tmp_path / "answers",
+            "ANNOTATION_STORAGE_FOLDER": tmp_path / "annotations",
         }
-
-        response = client.post("/api/v1/export/annotated-pdfs", json=request_data)
-
-        # Should return error when folder doesn't exist
-        assert response.status_code in [400, 404, 500]
-
-
-def test_export_annotated_pdfs_no_annotations(client):
-    """Test export when there are no annotations"""
-    
-    with patch("app.core.config.settings") as mock_settings, \
-         patch("app.routers.export.zipfile.ZipFile"), \
-         patch("app.routers.export.tempfile.mkdtemp") as mock_mkdtemp, \
-         patch("app.routers.export.Path") as mock_path, \
-         patch("app.routers.export.FileResponse"):
-
-        # Setup mocks
-        mock_temp_dir = Path("/tmp/test")
-        mock_mkdtemp.return_value = str(mock_temp_dir)
-
-        # Mock settings paths
-        mock_settings.ANSWER_SHEET_STORAGE_FOLDER = Path("/answers")
-        mock_settings.ANNOTATION_STORAGE_FOLDER = Path("/annotations")
-
-        # Mock path operations
-        mock_answer_folder = MagicMock()
-        mock_answer_folder.exists.return_value = True
-        mock_answer_folder.glob.return_value = [Path("/answers/student1.pdf")]
-
-        mock_annotation_folder = MagicMock()
-        mock_annotation_folder.exists.return_value = True
-
-        mock_student_annotation_dir = MagicMock()
-        mock_student_annotation_dir.exists.return_value = False  # No annotations for this student
-
-        def mock_path_constructor(path_str):
-            if "answers" in str(path_str):
-                return mock_answer_folder
-            elif "annotations" in str(path_str) and "student1" in str(path_str):
-                return mock_student_annotation_dir
-            elif "annotations" in str(path_str):
-                return mock_annotation_folder
-            return MagicMock()
-
-        mock_path.side_effect = mock_path_constructor
-
-        request_data = {
-            "course_id": "550e8400-e29b-41d4-a716-446655440000",
-            "assessment_id": "550e8400-e29b-41d4-a716-446655440001"
-        }
-
-        response = client.post("/api/v1/export/annotated-pdfs", json=request_data)
-
-        # Should handle case with no annotations
-        assert response.status_code in [200, 404, 500]
-
-
-def test_export_annotated_pdfs_invalid_json(client):
-    """Test export when annotation file contains invalid JSON"""
-    
-    with patch("app.core.config.settings") as mock_settings, \
-         patch("app.routers.export.zipfile.ZipFile"), \
-         patch("app.routers.export.tempfile.mkdtemp") as mock_mkdtemp, \
-         patch("app.routers.export.Path") as mock_path, \
-         patch("app.routers.export.FileResponse"):
-
-        # Setup mocks
-        mock_temp_dir = Path("/tmp/test")
-        mock_mkdtemp.return_value = str(mock_temp_dir)
-
-        # Mock settings paths
-        mock_settings.ANSWER_SHEET_STORAGE_FOLDER = Path("/answers")
-        mock_settings.ANNOTATION_STORAGE_FOLDER = Path("/annotations")
-
-        # Mock path operations
-        mock_answer_folder = MagicMock()
-        mock_answer_folder.exists.return_value = True
-        mock_answer_folder.glob.return_value = [Path("/answers/student1.pdf")]
-
-        mock_annotation_folder = MagicMock()
-        mock_annotation_folder.exists.return_value = True
-
-        mock_student_annotation_dir = MagicMock()
-        mock_student_annotation_dir.exists.return_value = True
-        mock_student_annotation_dir.glob.return_value = [Path("/annotations/student1/page_1.json")]
-
-        def mock_path_constructor(path_str):
-            if "answers" in str(path_str):
-                return mock_answer_folder
-            elif "annotations" in str(path_str) and "student1" in str(path_str):
-                return mock_student_annotation_dir
-            elif "annotations" in str(path_str):
-                return mock_annotation_folder
-            return MagicMock()
-
-        mock_path.side_effect = mock_path_constructor
-
-        # Mock json.load to raise an exception
-        with patch("json.load") as mock_json_load:
-            mock_json_load.side_effect = json.JSONDecodeError("Expecting value", "doc", 0)
-
-            request_data = {
-                "course_id": "550e8400-e29b-41d4-a716-446655440000",
-                "assessment_id": "550e8400-e29b-41d4-a716-446655440001"
-            }
-
-            response = client.post("/api/v1/export/annotated-pdfs", json=request_data)
-
-            # Should handle invalid JSON gracefully
-            assert response.status_code in [200, 400, 404, 500]
\ No newline at end of file
+    )
+    service = FakeAnnotationService()
+    client.app.dependency_overrides[get_settings] = lambda: fake_settings
+    client.app.dependency_overrides[get_pdf_annotation_service] = lambda: service
+    yield fake_settings, service
+    client.app.dependency_overrides.pop(get_settings, None)
+    client.app.dependency_overrides.pop(get_pdf_annotation_service, None)
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize(
+    "scenario, expected_status, exported",
+    [
+        ("success", 200, ["student1.pdf"]),
+        ("answer_folder_not_found", 404, None),
+        ("no_annotations", 200, []),
+        ("invalid_json", 200, []),
+    ],
+)
+def test_export_annotated_pdfs(client, export_env, scenario, expected_status, exported):
+    """Export annotated PDFs, skipping students without usable annotations"""
+    fake_settings, service = export_env
+    course_id, assessment_id = REQUEST_DATA["course_id"], REQUEST_DATA["assessment_id"]
+    answer_folder = fake_settings.ANSWER_SHEET_STORAGE_FOLDER / course_id / assessment_id
+    annotation_dir = (
+        fake_settings.ANNOTATION_STORAGE_FOLDER / course_id / assessment_id / "student1"
+    )
+
+    if scenario != "answer_folder_not_found":
+        answer_folder.mkdir(parents=True)
+        (answer_folder / "student1.pdf").write_bytes(b"%PDF-1.4\n%%EOF")
+    if scenario == "success":
+        annotation_dir.mkdir(parents=True)
+        (annotation_dir / "page_1.json").write_text(
+            '{"page": 1, "lines": [], "texts": [], "stickyNotes": []}'
+        )
+    elif scenario == "invalid_json":
+        annotation_dir.mkdir(parents=True)
+        (annotation_dir / "page_1.json").write_text("not json")
+
+    response = client.post(
+        "/api/v1/export/annotated-pdfs", content=REQUEST_BODY, headers=JSON_HEADERS
+    )
+
+    assert response.status_code == expected_status, response.text
+    assert len(service.calls) == len(exported or [])
+    if exported is not None:
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zipf:
+            assert zipf.namelist() == exported
@@ -1,367 +1,186 @@
-from unittest.mock import patch, MagicMock
-from uuid import uuid4
+from contextlib import ExitStack
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import patch
+from uuid import UUID
+
+import pytest
+
+
+# Fixed ids for the mocked query objects; nothing compares them against rows
+STUDENT_ID, ASSESSMENT_ID, QUESTION_ID, REVIEWER_ID, QUERY_ID, COURSE_ID = (
+    str(UUID(int=i)) for i in range(1, 7)
+)
+
+# _enrich_query_response payload for a pending query; tests override the
+# fields their scenario changes
+_BASE_ENRICH = MappingProxyType({
+    "id": QUERY_ID,
+    "student_id": STUDENT_ID,
+    "assessment_id": ASSESSMENT_ID,
+    "question_id": QUESTION_ID,
+    "batch_id": None,
+    "current_mark": 8.0,
+    "requested_change": "Test change request",
+    "query_type": "regrade",
+    "status": "pending",
+    "reviewer_id": None,
+    "reviewer_response": None,
+    "new_mark": None,
+    "created_at": "2024-01-01T00:00:00Z",
+    "updated_at": "2024-01-01T00:00:00Z",
+})
+
+
+def fake_query(status="pending"):
+    """Stand-in for a MarkQuery row with the attributes the routes read"""
+    return SimpleNamespace(
+        id=QUERY_ID, status=status, assessment=SimpleNamespace(course_id=COURSE_ID)
+    )
+
+
+@pytest.fixture
+def mark_query_mocks():
+    """Patch the lookup, access check, update and enrichment the query routes call"""
+    targets = {
+        "get": "app.utils.validators.EntityValidator.get_mark_query_or_404",
+        "validate": "app.utils.validators.AccessValidator.validate_course_access",
+        "update": "app.routers.mark_queries.crud_mark_query.update_mark_query",
+        "enrich": "app.routers.mark_queries._enrich_query_response",
+    }
+    with ExitStack() as stack:
+        yield SimpleNamespace(
+            **{name: stack.enter_context(patch(target)) for name, target in targets.items()}
+        )
 
 
-def test_get_course_queries_success(client, admin_token):
+def test_get_course_queries_success(client, admin_headers, fake_uuid):
     """Test getting queries for a course successfully"""
     
-    course_id = str(uuid4())
+    course_id = str(fake_uuid())
     
-    with patch("app.routers.mark_queries.get_db") as mock_get_db:
-        
-        # Mock database
-        mock_db = MagicMock()
-        mock_get_db.return_value = mock_db
-        
-        # Mock user
-        mock_user = MagicMock()
-        mock_user.id = uuid4()
-        
-        # Mock queries
-        mock_query = MagicMock()
-        mock_query.all.return_value = []
-        mock_db.query.return_value = mock_query
-        
-        response = client.get(
-            f"/api/v1/mark-queries/course/{course_id}",
-            headers={"Authorization": f"Bearer {admin_token}"}
-        )
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert isinstance(data, list)
+    response = client.get(
+        f"/api/v1/mark-queries/course/{course_id}",
+        headers=admin_headers
+    )
+    
+    assert response.status_code == 200, response.text
+    assert response.json() == []
 
 
-def test_get_course_queries_with_filters(client, admin_token):
+def test_get_course_queries_with_filters(client, admin_headers, fake_uuid):
     """Test getting queries with filters"""
     
-    course_id = str(uuid4())
-    
-    with patch("app.routers.mark_queries.get_db") as mock_get_db:
-        
-        # Mock database
-        mock_db = MagicMock()
-        mock_get_db.return_value = mock_db
-        
-        # Mock user
-        mock_user = MagicMock()
-        mock_user.id = uuid4()
-        
-        # Mock queries
-        mock_query = MagicMock()
-        mock_query.filter().all.return_value = []
-        mock_db.query.return_value = mock_query
-        
-        response = client.get(
-            f"/api/v1/mark-queries/course/{course_id}?status=pending&assessment_id={uuid4()}",
-            headers={"Authorization": f"Bearer {admin_token}"}
-        )
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert isinstance(data, list)
-
-
-def test_get_query_details_success(client, admin_token):
-    """Test getting query details successfully"""
+    course_id = str(fake_uuid())
     
-    query_id = str(uuid4())
+    response = client.get(
+        f"/api/v1/mark-queries/course/{course_id}?status=pending&assessment_id={fake_uuid()}",
+        headers=admin_headers
+    )
     
-    with patch("app.utils.validators.EntityValidator.get_mark_query_or_404") as mock_get_query, \
-         patch("app.routers.mark_queries._enrich_query_response") as mock_enrich, \
-         patch("app.utils.validators.AccessValidator.validate_course_access") as mock_validate:
-        
-        # Mock CRUD function
-        mock_query_obj = MagicMock()
-        mock_query_obj.id = query_id
-        mock_query_obj.status = "pending"
-        mock_query_obj.assessment.course_id = uuid4()
-        mock_get_query.return_value = mock_query_obj
-        
-        # Mock validation
-        mock_validate.return_value = None
-        
-        # Mock enrich response
-        mock_enrich.return_value = {
-            "id": query_id,
-            "student_id": str(uuid4()),
-            "assessment_id": str(uuid4()),
-            "question_id": str(uuid4()),
-            "batch_id": None,
-            "current_mark": 8.0,
-            "requested_change": "Test change request", 
-            "query_type": "regrade",
-            "status": "pending",
-            "reviewer_id": None,
-            "reviewer_response": None,
-            "new_mark": None,
-            "created_at": "2024-01-01T00:00:00Z",
-            "updated_at": "2024-01-01T00:00:00Z"
-        }
-        
-        response = client.get(
-            f"/api/v1/mark-queries/{query_id}",
-            headers={"Authorization": f"Bearer {admin_token}"}
-        )
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["id"] == query_id
+    assert response.status_code == 200, response.text
+    assert response.json() == []
 
 
-def test_get_query_details_not_found(client, admin_token):
-    """Test getting query details when query not found"""
+def test_get_query_details_success(client, admin_headers, mark_query_mocks):
+    """Test getting query details successfully"""
     
-    query_id = str(uuid4())
+    mark_query_mocks.get.return_value = fake_query()
+    mark_query_mocks.enrich.return_value = dict(_BASE_ENRICH)
     
-    with patch("app.routers.mark_queries.get_db") as mock_get_db:
-        
-        # Mock database
-        mock_db = MagicMock()
-        mock_get_db.return_value = mock_db
-        
-        # Mock query not found
-        mock_query = MagicMock()
-        mock_query.filter().first.return_value = None
-        mock_db.query.return_value = mock_query
-        
-        response = client.get(
-            f"/api/v1/mark-queries/{query_id}",
-            headers={"Authorization": f"Bearer {admin_token}"}
-        )
-        
-        assert response.status_code == 404
-
-
-def test_respond_to_query_approve(client, admin_token):
-    """Test approving a mark query"""
+    response = client.get(
+        f"/api/v1/mark-queries/{QUERY_ID}",
+        headers=admin_headers
+    )
     
-    query_id = str(uuid4())
-    
-    with patch("app.utils.validators.EntityValidator.get_mark_query_or_404") as mock_get_query, \
-         patch("app.routers.mark_queries.crud_mark_query.update_mark_query") as mock_update_query, \
-         patch("app.routers.mark_queries._enrich_query_response") as mock_enrich, \
-         patch("app.utils.validators.AccessValidator.validate_course_access") as mock_validate:
-        
-        # Mock CRUD functions
-        mock_query_obj = MagicMock()
-        mock_query_obj.id = query_id
-        mock_query_obj.status = "pending"
-        mock_query_obj.assessment.course_id = uuid4()
-        mock_get_query.return_value = mock_query_obj
-        
-        mock_updated_query = MagicMock()
-        mock_updated_query.id = query_id
-        mock_updated_query.status = "approved"
-        mock_update_query.return_value = mock_updated_query
-        
-        # Mock validation
-        mock_validate.return_value = None
-        
-        # Mock enrich response
-        mock_enrich.return_value = {
-            "id": query_id,
-            "student_id": str(uuid4()),
-            "assessment_id": str(uuid4()),
-            "question_id": str(uuid4()),
-            "batch_id": None,
-            "current_mark": 8.0,
-            "requested_change": "Test change request", 
-            "query_type": "regrade",
-            "status": "approved",
-            "reviewer_id": str(uuid4()),
-            "reviewer_response": "Query approved",
-            "new_mark": 9.0,
-            "created_at": "2024-01-01T00:00:00Z",
-            "updated_at": "2024-01-01T00:00:00Z"
-        }
-        
-        request_data = {
-            "status": "approved",
-            "reviewer_response": "Query approved"
-        }
-        
-        response = client.put(
-            f"/api/v1/mark-queries/{query_id}/respond",
-            headers={"Authorization": f"Bearer {admin_token}"},
-            json=request_data
-        )
-        
-        assert response.status_code == 200
+    assert response.status_code == 200, response.text
+    assert response.json()["id"] == QUERY_ID
 
 
-def test_respond_to_query_reject(client, admin_token):
-    """Test rejecting a mark query"""
-    
-    query_id = str(uuid4())
+def test_get_query_details_not_found(client, admin_headers, fake_uuid):
+    """Test getting query details when query not found"""
     
-    with patch("app.utils.validators.EntityValidator.get_mark_query_or_404") as mock_get_query, \
-         patch("app.routers.mark_queries.crud_mark_query.update_mark_query") as mock_update_query, \
-         patch("app.routers.mark_queries._enrich_query_response") as mock_enrich, \
-         patch("app.utils.validators.AccessValidator.validate_course_access") as mock_validate:
-        
-        # Mock CRUD functions
-        mock_query_obj = MagicMock()
-        mock_query_obj.id = query_id
-        mock_query_obj.status = "pending"
-        mock_query_obj.assessment.course_id = uuid4()
-        mock_get_query.return_value = mock_query_obj
-        
-        mock_updated_query = MagicMock()
-        mock_updated_query.id = query_id
-        mock_updated_query.status = "rejected"
-        mock_update_query.return_value = mock_updated_query
-        
-        # Mock validation
-        mock_validate.return_value = None
-        
-        # Mock enrich response
-        mock_enrich.return_value = {
-            "id": query_id,
-            "student_id": str(uuid4()),
-            "assessment_id": str(uuid4()),
-            "question_id": str(uuid4()),
-            "batch_id": None,
-            "current_mark": 8.0,
-            "requested_change": "Test change request", 
-            "query_type": "regrade",
-            "status": "rejected",
-            "reviewer_id": str(uuid4()),
-            "reviewer_response": "Query rejected",
-            "new_mark": None,
-            "created_at": "2024-01-01T00:00:00Z",
-            "updated_at": "2024-01-01T00:00:00Z"
-        }
-        
-        request_data = {
-            "status": "rejected",
-            "reviewer_response": "Query rejected"
-        }
-        
-        response = client.put(
-            f"/api/v1/mark-queries/{query_id}/respond",
-            headers={"Authorization": f"Bearer {admin_token}"},
-            json=request_data
-        )
-        
-        assert response.status_code == 200
-
-
-def test_respond_to_query_already_resolved(client, admin_token):
+    query_id = str(fake_uuid())
+    
+    response = client.get(
+        f"/api/v1/mark-queries/{query_id}",
+        headers=admin_headers
+    )
+    
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "endpoint, status, reviewer_response, new_mark",
+    [
+        ("respond", "approved", "Query approved", 9.0),
+        ("respond", "rejected", "Query rejected", None),
+        ("status", "under_review", None, None),
+    ],
+)
+def test_respond_variants(
+    client, admin_headers, mark_query_mocks, endpoint, status, reviewer_response, new_mark
+):
+    """Test approving, rejecting and marking a pending query as under review"""
+    
+    mark_query_mocks.get.return_value = fake_query()
+    mark_query_mocks.update.return_value = fake_query(status)
+    mark_query_mocks.enrich.return_value = {
+        **_BASE_ENRICH,
+        "status": status,
+        "reviewer_id": REVIEWER_ID if reviewer_response else None,
+        "reviewer_response": reviewer_response,
+        "new_mark": new_mark,
+    }
+    
+    request_data = {"status": status}
+    if reviewer_response:
+        request_data["reviewer_response"] = reviewer_response
+    
+    response = client.put(
+        f"/api/v1/mark-queries/{QUERY_ID}/{endpoint}",
+        headers=admin_headers,
+        json=request_data
+    )
+    
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == status
+
+
+def test_respond_to_query_already_resolved(client, admin_headers, mark_query_mocks):
     """Test responding to already resolved query"""
     
-    query_id = str(uuid4())
+    mark_query_mocks.get.return_value = fake_query("approved")  # Already resolved
     
-    with patch("app.utils.validators.EntityValidator.get_mark_query_or_404") as mock_get_query, \
-         patch("app.utils.validators.AccessValidator.validate_course_access") as mock_validate:
-        
-        # Mock CRUD function
-        mock_query_obj = MagicMock()
-        mock_query_obj.id = query_id
-        mock_query_obj.status = "approved"  # Already resolved
-        mock_query_obj.assessment.course_id = uuid4()
-        mock_get_query.return_value = mock_query_obj
-        
-        # Mock validation
-        mock_validate.return_value = None
-        
-        request_data = {
-            "status": "approved",
-            "reviewer_response": "Query approved"
-        }
-        
-        response = client.put(
-            f"/api/v1/mark-queries/{query_id}/respond",
-            headers={"Authorization": f"Bearer {admin_token}"},
-            json=request_data
-        )
-        
-        assert response.status_code == 400
-
-
-def test_update_query_status(client, admin_token):
-    """Test updating query status"""
+    request_data = {
+        "status": "approved",
+        "reviewer_response": "Query approved"
+    }
     
-    query_id = str(uuid4())
+    response = client.put(
+        f"/api/v1/mark-queries/{QUERY_ID}/respond",
+        headers=admin_headers,
+        json=request_data
+    )
     
-    with patch("app.utils.validators.EntityValidator.get_mark_query_or_404") as mock_get_query, \
-         patch("app.routers.mark_queries.crud_mark_query.update_mark_query") as mock_update_query, \
-         patch("app.routers.mark_queries._enrich_query_response") as mock_enrich, \
-         patch("app.utils.validators.AccessValidator.validate_course_access") as mock_validate:
-        
-        # Mock CRUD functions
-        mock_query_obj = MagicMock()
-        mock_query_obj.id = query_id
-        mock_query_obj.status = "pending"
-        mock_query_obj.assessment.course_id = uuid4()
-        mock_get_query.return_value = mock_query_obj
-        
-        mock_updated_query = MagicMock()
-        mock_updated_query.id = query_id
-        mock_updated_query.status = "under_review"
-        mock_update_query.return_value = mock_updated_query
-        
-        # Mock validation
-        mock_validate.return_value = None
-        
-        # Mock enrich response
-        mock_enrich.return_value = {
-            "id": query_id,
-            "student_id": str(uuid4()),
-            "assessment_id": str(uuid4()),
-            "question_id": str(uuid4()),
-            "batch_id": None,
-            "current_mark": 8.0,
-            "requested_change": "Test change request", 
-            "query_type": "regrade",
-            "status": "under_review",
-            "reviewer_id": None,
-            "reviewer_response": None,
-            "new_mark": None,
-            "created_at": "2024-01-01T00:00:00Z",
-            "updated_at": "2024-01-01T00:00:00Z"
-        }
-        
-        request_data = {
-            "status": "under_review"
-        }
-        
-        response = client.put(
-            f"/api/v1/mark-queries/{query_id}/status",
-            headers={"Authorization": f"Bearer {admin_token}"},
-            json=request_data
-        )
-        
-        assert response.status_code == 200
+    assert response.status_code == 400
+    mark_query_mocks.update.assert_not_called()
 
 
-def test_get_query_stats(client, admin_token):
+def test_get_query_stats(client, admin_headers, fake_uuid):
     """Test getting query statistics"""
     
-    course_id = str(uuid4())
+    course_id = str(fake_uuid())
     
-    with patch("app.routers.mark_queries.get_db") as mock_get_db:
-        
-        # Mock database
-        mock_db = MagicMock()
-        mock_get_db.return_value = mock_db
-        
-        # Mock stats queries
-        mock_query = MagicMock()
-        mock_query.filter().count.return_value = 5
-        mock_db.query.return_value = mock_query
-        
-        response = client.get(
-            f"/api/v1/mark-queries/course/{course_id}/stats",
-            headers={"Authorization": f"Bearer {admin_token}"}
-        )
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert "total_queries" in data
+    response = client.get(
+        f"/api/v1/mark-queries/course/{course_id}/stats",
+        headers=admin_headers
+    )
+    
+    assert response.status_code == 200, response.text
+    assert response.json()["total_queries"] == 0
 
 
-# def test_bulk_update_status(client, admin_token):
+# def test_bulk_update_status(client, admin_headers):
 #     """Test bulk updating query status"""
     
 #     # Skip this test due to FastAPI route ordering issue where /bulk/status 
@@ -395,43 +214,25 @@ def test_get_query_stats(client, admin_token):
         
 #         response = client.put(
 #             "/api/v1/mark-queries/bulk/status",
-#             headers={"Authorization": f"Bearer {admin_token}"},
+#             headers=admin_headers,
 #             json=request_data
 #         )
         
 #         assert response.status_code == 200
 
 
-def test_commit_grades_to_gradebook(client, admin_token):
+def test_commit_grades_to_gradebook(client, admin_headers, fake_uuid):
     """Test committing grades to gradebook"""
     
-    with patch("app.routers.mark_queries.get_db") as mock_get_db, \
-         patch("app.routers.mark_queries.validate_course_access") as mock_validate:
-        
-        # Mock database
-        mock_db = MagicMock()
-        mock_get_db.return_value = mock_db
-        
-        # Mock validation
-        mock_validate.return_value = None
-        
-        # Mock approved queries
-        mock_queries = [MagicMock() for _ in range(2)]
-        for mock_query in mock_queries:
-            mock_query.assessment.course_id = uuid4()
-        
-        mock_query = MagicMock()
-        mock_query.filter().all.return_value = mock_queries
-        mock_db.query.return_value = mock_query
-        
-        request_data = {
-            "query_ids": [str(uuid4()), str(uuid4())]
-        }
-        
-        response = client.post(
-            "/api/v1/mark-queries/commit-grades",
-            headers={"Authorization": f"Bearer {admin_token}"},
-            json=request_data
-        )
-        
-        assert response.status_code == 200
\ No newline at end of file
+    query_ids = [str(fake_uuid()), str(fake_uuid())]
+    
+    response = client.post(
+        "/api/v1/mark-queries/commit-grades",
+        headers=admin_headers,
+        json={"query_ids": query_ids}
+    )
+    
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["committed_count"] == 0
+    assert data["failed_query_ids"] == query_ids
@@ -0,0 +1,188 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.constants import PrimaryRoles
+from app.main import json_etag
+from app.utils.validators import AccessValidator, auth_cache, new_auth_cache
+
+from .conftest import auth_headers, ok
+
+
+def test_json_get_carries_etag(client, assessment, teacher):
+    """A JSON GET is tagged with a weak ETag that is stable across requests"""
+    url = f"/api/v1/assessments/{assessment.id}"
+
+    first = client.get(url, headers=auth_headers(teacher))
+    second = client.get(url, headers=auth_headers(teacher))
+
+    assert ok(first)["id"] == str(assessment.id)
+    assert first.headers["ETag"].startswith('W/"')
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+
+def test_matching_if_none_match_returns_304(client, assessment, teacher):
+    """Sending back the current ETag gets an empty 304 instead of the body"""
+    url = f"/api/v1/assessments/{assessment.id}"
+    etag = client.get(url, headers=auth_headers(teacher)).headers["ETag"]
+
+    response = client.get(url, headers={**auth_headers(teacher), "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    [
+        "*",
+        'W/"stale", {etag}',
+        '"stale" , {etag} ,W/"older"',
+        "{strong}",
+    ],
+    ids=["wildcard", "list", "spaced-list", "strong-form"],
+)
+def test_if_none_match_forms_return_304(client, assessment, teacher, if_none_match):
+    """If-None-Match uses weak comparison over a comma-separated list or *"""
+    url = f"/api/v1/assessments/{assessment.id}"
+    etag = client.get(url, headers=auth_headers(teacher)).headers["ETag"]
+    header = if_none_match.format(etag=etag, strong=etag.removeprefix("W/"))
+
+    response = client.get(url, headers={**auth_headers(teacher), "If-None-Match": header})
+
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_stale_if_none_match_returns_body(client, assessment, teacher):
+    """An ETag from an older representation gets the full 200 response"""
+    url = f"/api/v1/assessments/{assessment.id}"
+    etag = client.get(url, headers=auth_headers(teacher)).headers["ETag"]
+    client.patch(url, json={"title": "Renamed"}, headers=auth_headers(teacher))
+
+    response = client.get(url, headers={**auth_headers(teacher), "If-None-Match": etag})
+
+    assert ok(response)["title"] == "Renamed"
+    assert response.headers["ETag"] != etag
+
+
+def test_non_get_response_has_no_etag(client, assessment, teacher):
+    """Writes pass through untouched, even when they return JSON"""
+    response = client.patch(
+        f"/api/v1/assessments/{assessment.id}",
+        json={"title": "Renamed"},
+        headers=auth_headers(teacher),
+    )
+
+    assert ok(response)["title"] == "Renamed"
+    assert "ETag" not in response.headers
+
+
+def test_non_json_get_has_no_etag(client, course, teacher, pdf_bytes):
+    """File downloads are not buffered or tagged"""
+    headers = auth_headers(teacher)
+    assessment_id = ok(client.post(
+        "/api/v1/assessments/upload",
+        data={"title": "Final Exam", "course_id": str(course.id)},
+        files={"file": ("exam.pdf", pdf_bytes, "application/pdf")},
+        headers=headers,
+    ))["id"]
+
+    response = client.get(
+        f"/api/v1/assessments/{assessment_id}/question-paper",
+        headers={**headers, "If-None-Match": "*"},
+    )
+
+    assert response.status_code == 200
+    assert response.content == pdf_bytes
+    assert "ETag" not in response.headers
+
+
+def test_etag_keeps_repeated_headers():
+    """Repeated header fields such as Set-Cookie survive on both 200 and 304"""
+    cookie_app = FastAPI()
+    cookie_app.middleware("http")(json_etag)
+
+    @cookie_app.get("/cookies")
+    def cookies():
+        response = JSONResponse({"ok": True})
+        response.set_cookie("a", "1")
+        response.set_cookie("b", "2")
+        return response
+
+    with TestClient(cookie_app) as cookie_client:
+        first = cookie_client.get("/cookies")
+        cached = cookie_client.get("/cookies", headers={"If-None-Match": first.headers["ETag"]})
+
+    for response in (first, cached):
+        assert len(response.headers.get_list("set-cookie")) == 2
+    assert first.json() == {"ok": True}
+    assert cached.status_code == 304
+
+
+class CountingRoles(list):
+    """course_roles stand-in that counts how often the role checks walk it"""
+
+    iterations = 0
+
+    def __iter__(self):
+        self.iterations += 1
+        return super().__iter__()
+
+
+def test_role_checks_reuse_request_cache(db_session, teacher, course):
+    """Within one request the user's memberships are indexed once for every check"""
+    user = SimpleNamespace(
+        id=teacher.id,
+        primary_role_id=PrimaryRoles.STAFF,
+        course_roles=CountingRoles(teacher.course_roles),
+    )
+    checks = (
+        AccessValidator.validate_course_access,
+        AccessValidator.validate_convener_access,
+        AccessValidator.validate_facilitator_or_convener_access,
+    )
+
+    # Outside a request every check walks the roles again
+    for check in checks:
+        check(db_session, user, course.id)
+    assert user.course_roles.iterations == len(checks)
+
+    user.course_roles.iterations = 0
+    token = auth_cache.set(new_auth_cache())
+    try:
+        for check in checks:
+            check(db_session, user, course.id)
+        cache = auth_cache.get()
+    finally:
+        auth_cache.reset(token)
+
+    assert user.course_roles.iterations == 1
+    assert cache["memberships"] == {
+        teacher.id: {role.course_id: role.course_role_id for role in teacher.course_roles}
+    }
+
+
+def test_auth_cache_is_fresh_per_request(client, assessment, teacher, student):
+    """Each request gets its own cache, so one user's lookups never reach the next request"""
+    caches = []
+
+    def record():
+        caches.append(new_auth_cache())
+        return caches[-1]
+
+    url = f"/api/v1/assessments/{assessment.id}"
+    with patch("app.main.new_auth_cache", side_effect=record):
+        assert client.get(url, headers=auth_headers(teacher)).status_code == 200
+        assert client.get(url, headers=auth_headers(student)).status_code == 403
+
+    assert len(caches) == 2
+    assert caches[0] is not caches[1]
+    assert set(caches[0]["memberships"]) == {teacher.id}
+    assert set(caches[1]["memberships"]) == {student.id}
+    assert auth_cache.get() is None
@@ -0,0 +1,167 @@
+import fitz
+import numpy as np
+import pytest
+
+from app.services._geom_numba import _kept_intervals
+from app.services.pdf_annotation_service import PdfAnnotationService
+
+
+@pytest.fixture
+def service():
+    return PdfAnnotationService()
+
+
+def eraser_setup(service, eraser_points, r):
+    """Capsules for one eraser stroke and a 100x100 grid indexing them"""
+    capsules = service.build_capsules(np.asarray(eraser_points, dtype=np.float64), r)
+    grid = service.UniformGrid(0.0, 0.0, 100.0, 100.0, 8.0)
+    grid.insert_capsule_batch(capsules.capsule_aabb)
+    return capsules, grid
+
+
+def brute_force_erased(a, b, capsules, ts):
+    """Whether the point at each t along AB lies within r of some capsule centerline"""
+    p = a + ts[:, None] * (b - a)
+    erased = np.zeros(len(ts), dtype=bool)
+    for ax, ay, bx, by, r in zip(capsules.ax, capsules.ay, capsules.bx, capsules.by, capsules.r):
+        c, d = np.array([ax, ay]), np.array([bx, by])
+        cd = d - c
+        L2 = cd @ cd
+        s = np.clip((p - c) @ cd / L2, 0.0, 1.0) if L2 > 0 else np.zeros(len(ts))
+        diff = p - (c + s[:, None] * cd)
+        erased |= np.einsum("ij,ij->i", diff, diff) <= r * r
+    return erased
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_kept_intervals_matches_sampling(service, seed):
+    """Kept intervals agree with point sampling away from the interval boundaries"""
+    rng = np.random.default_rng(seed)
+    a, b = rng.uniform(0, 100, 2), rng.uniform(0, 100, 2)
+    # A random walk crossing the segment's neighbourhood, plus a repeated sample
+    walk = np.cumsum(rng.normal(0, 6, (12, 2)), axis=0) + (a + b) / 2
+    walk = np.insert(walk, 3, walk[3], axis=0)
+    capsules = service.build_capsules(walk, float(rng.uniform(1, 6)))
+
+    kept = _kept_intervals(
+        a[0], a[1], b[0], b[1],
+        capsules.ax, capsules.ay, capsules.bx, capsules.by, capsules.r,
+        np.arange(len(capsules), dtype=np.int32),
+    )
+
+    assert np.all(np.diff(kept.ravel()) >= 0)
+    ts = np.linspace(0.0, 1.0, 4001)
+    inside = ((ts[:, None] >= kept[:, 0]) & (ts[:, None] <= kept[:, 1])).any(axis=1)
+    near_edge = (np.abs(ts[:, None] - kept.ravel()) < 1e-6).any(axis=1) if len(kept) else False
+    erased = brute_force_erased(a, b, capsules, ts)
+    assert np.array_equal(inside[~near_edge], ~erased[~near_edge])
+
+
+def dist_to_capsules(points, ax, ay, bx, by, r):
+    """Distance from each point to the nearest capsule, minus that capsule's radius"""
+    p = points[:, None, :]
+    c = np.stack((ax, ay), axis=1)[None]
+    cd = np.stack((bx - ax, by - ay), axis=1)[None]
+    L2 = np.maximum((cd * cd).sum(axis=2), 1e-300)
+    s = np.clip(((p - c) * cd).sum(axis=2) / L2, 0.0, 1.0)
+    diff = p - (c + s[..., None] * cd)
+    return (np.sqrt((diff * diff).sum(axis=2)) - r[None]).min(axis=1)
+
+
+def test_build_capsules_welds_jittered_dense_stroke(service):
+    """A dense curved stroke with sub-pixel jitter welds, and stays within 2x tolerance of exact"""
+    rng = np.random.default_rng(0)
+    t = np.linspace(0.0, np.pi / 2, 400)
+    pts = np.column_stack((300 + 200 * np.cos(t), 300 + 200 * np.sin(t)))
+    pts += rng.normal(0.0, 0.02, pts.shape)
+    r = 5.0
+    tol = service.ERASER_WELD_TOLERANCE
+
+    capsules = service.build_capsules(pts, r)
+
+    assert len(capsules) <= (len(pts) - 1) // 3
+    assert set(np.unique(capsules.r)) <= {r, r + tol}
+    # Compare against one radius-r capsule per sample pair at points near the stroke
+    probes = pts[rng.integers(0, len(pts), 4000)] + rng.uniform(-r - 1, r + 1, (4000, 2))
+    exact = dist_to_capsules(
+        probes, pts[:-1, 0], pts[:-1, 1], pts[1:, 0], pts[1:, 1], np.full(len(pts) - 1, r)
+    )
+    welded = dist_to_capsules(
+        probes, capsules.ax, capsules.ay, capsules.bx, capsules.by, capsules.r
+    )
+    # Everything the exact eraser covers is still covered...
+    assert np.all(welded[exact <= 0] <= 1e-9)
+    # ...and nothing further than twice the tolerance from it is
+    assert np.all(exact[welded <= 0] <= 2 * tol + 1e-9)
+
+
+def test_filter_polyline_without_contact_returns_input(service):
+    """A polyline away from the eraser comes back as the same arrays"""
+    pts = np.array([[0.0, 10.0], [50.0, 10.0], [100.0, 10.0]])
+    boxes = service.edge_aabbs(pts)
+    capsules, grid = eraser_setup(service, [[50.0, 60.0], [50.0, 90.0]], 2.0)
+
+    result = service.filter_polyline_vectorized(pts, boxes, capsules, grid)
+
+    assert len(result) == 1
+    assert result[0][0] is pts and result[0][1] is boxes
+
+
+def test_filter_polyline_stitches_pieces(service):
+    """Untouched vertices stay in their runs and each run gets matching edge AABBs"""
+    pts = np.column_stack((np.arange(0.0, 101.0, 10.0), np.full(11, 50.0)))
+    capsules, grid = eraser_setup(service, [[45.0, 0.0], [45.0, 100.0]], 2.0)
+
+    result = service.filter_polyline_vectorized(pts, service.edge_aabbs(pts), capsules, grid)
+
+    assert len(result) == 2
+    (left, _), (right, _) = result
+    np.testing.assert_allclose(left, np.vstack((pts[:5], [[43.0, 50.0]])))
+    np.testing.assert_allclose(right, np.vstack(([[47.0, 50.0]], pts[5:])))
+    for run, boxes in result:
+        np.testing.assert_allclose(boxes, service.edge_aabbs(run))
+
+
+def test_filter_polyline_drops_fully_erased_edge(service):
+    """An edge swallowed by the eraser splits the polyline without leaving a stub"""
+    pts = np.array([[10.0, 50.0], [40.0, 50.0], [42.0, 50.0], [80.0, 50.0]])
+    capsules, grid = eraser_setup(service, [[41.0, 0.0], [41.0, 100.0]], 3.0)
+
+    result = service.filter_polyline_vectorized(pts, service.edge_aabbs(pts), capsules, grid)
+
+    assert [run.tolist() for run, _ in result] == [
+        [[10.0, 50.0], [38.0, 50.0]],
+        [[44.0, 50.0], [80.0, 50.0]],
+    ]
+
+
+def test_burn_annotations_to_pdf_smoke(service, tmp_path):
+    """Lines, erasers, text and sticky notes burn onto a one-page PDF"""
+    doc = fitz.open()
+    doc.new_page(width=600, height=800)
+    input_path = tmp_path / "in.pdf"
+    output_path = tmp_path / "out.pdf"
+    doc.save(input_path)
+    annotations = [{
+        "page": 1,
+        "data": {
+            "lines": [
+                {"tool": "pencil", "points": [10, 10, 90, 10], "stroke": "red", "strokeWidth": 2},
+                {"tool": "pencil", "points": [10, 20, 90, 20], "stroke": "#0000ff", "strokeWidth": 2},
+                {"tool": "fine-eraser", "points": [50, 0, 50, 30], "strokeWidth": 10},
+            ],
+            "texts": [{"x": 20, "y": 50, "text": "Good", "fontSize": 12}],
+            "stickyNotes": [{"x": 70, "y": 70, "text": "See me"}],
+        },
+    }]
+
+    service.burn_annotations_to_pdf(str(input_path), str(output_path), annotations)
+
+    page = fitz.open(output_path)[0]
+    # The sticky note icon also shows up as drawings, so look at the strokes only
+    strokes = [d for d in page.get_drawings() if d["type"] == "s"]
+    # Each line is cut in two by the eraser and keeps its place in the stacking order
+    assert [d["color"] for d in strokes] == [(1.0, 0.0, 0.0), (0.0, 0.0, 1.0)]
+    assert [len(d["items"]) for d in strokes] == [2, 2]
+    assert "Good" in page.get_text()
+    assert [annot.info["content"] for annot in page.annots()] == ["See me"]
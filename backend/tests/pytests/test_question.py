@@ -1,3 +1,4 @@
+from app.models.question import Question
 from .conftest import auth_headers
 
 
@@ -41,12 +42,10 @@ def test_update_question(client, question, teacher):
     assert response.json()["memo"] == "Updated memo"
 
 
-def test_delete_question(client, question, teacher):
+def test_delete_question(client, db_session, question, teacher):
     headers = auth_headers(teacher)
     response = client.delete(f"/api/v1/questions/{question.id}", headers=headers)
     assert response.status_code == 200
     assert response.json()["message"] == "Question deleted"
 
-    # Confirm deletion
-    follow_up = client.get(f"/api/v1/questions/{question.id}", headers=headers)
-    assert follow_up.status_code == 404
+    assert db_session.get(Question, question.id) is None
@@ -1,15 +1,27 @@
-from unittest.mock import patch, MagicMock
-from uuid import uuid4
+import pytest
+from unittest.mock import create_autospec, patch
 
+from fastapi import HTTPException
 
-def test_create_query_success(client, admin_token, assessment, question):
+from app.models.mark_query import MarkQuery
+from app.routers.student_queries import (
+    create_query,
+    get_batch_queries,
+    get_my_queries,
+    get_query,
+)
+from app.schemas.mark_query import MarkQueryCreate
+
+
+def test_create_query_success(client, auth_as, admin, assessment, question, fake_uuid):
     """Test successfully creating a mark query"""
+    auth_as(admin)
     
-    with patch("app.utils.validators.EntityValidator.get_assessment_or_404") as mock_get_assessment, \
-         patch("app.utils.validators.EntityValidator.get_question_or_404") as mock_get_question, \
-         patch("app.routers.student_queries.crud_mark_query.check_existing_pending_query") as mock_check, \
-         patch("app.routers.student_queries.crud_mark_query.create_mark_query") as mock_create, \
-         patch("app.routers.student_queries._enrich_query_response") as mock_enrich:
+    with patch("app.utils.validators.EntityValidator.get_assessment_or_404", autospec=True) as mock_get_assessment, \
+         patch("app.utils.validators.EntityValidator.get_question_or_404", autospec=True) as mock_get_question, \
+         patch("app.routers.student_queries.crud_mark_query.check_existing_pending_query", autospec=True) as mock_check, \
+         patch("app.routers.student_queries.crud_mark_query.create_mark_query", autospec=True) as mock_create, \
+         patch("app.routers.student_queries._enrich_query_response", autospec=True) as mock_enrich:
         
         # Mock validators
         mock_get_assessment.return_value = assessment
@@ -18,9 +30,9 @@ def test_create_query_success(client, admin_token, assessment, question):
         # Mock no existing pending query
         mock_check.return_value = False
         
-        # Mock created query
-        mock_query = MagicMock()
-        mock_query.id = uuid4()
+        # Mock created query, limited to MarkQuery's real attributes
+        mock_query = create_autospec(MarkQuery, instance=True, spec_set=True)
+        mock_query.id = fake_uuid()
         mock_query.assessment_id = assessment.id
         mock_query.question_id = question.id
         mock_create.return_value = mock_query
@@ -28,7 +40,7 @@ def test_create_query_success(client, admin_token, assessment, question):
         # Mock enrich response
         mock_enrich.return_value = {
             "id": str(mock_query.id),
-            "student_id": str(uuid4()),
+            "student_id": str(fake_uuid()),
             "assessment_id": str(assessment.id),
             "question_id": str(question.id),
             "batch_id": None,
@@ -51,87 +63,51 @@ def test_create_query_success(client, admin_token, assessment, question):
             "current_mark": 5.0
         }
         
-        response = client.post(
-            "/api/v1/student-queries/",
-            headers={"Authorization": f"Bearer {admin_token}"},
-            json=request_data
-        )
+        response = client.post("/api/v1/student-queries/", json=request_data)
         
-        assert response.status_code == 200
+        assert response.status_code == 200, response.text
         data = response.json()
         assert data["assessment_id"] == request_data["assessment_id"]
         assert data["question_id"] == request_data["question_id"]
+        mock_create.assert_called_once()
 
 
-def test_create_query_assessment_not_found(client, admin_token):
+def test_create_query_assessment_not_found(db_session, admin, fake_uuid):
     """Test creating query with non-existent assessment"""
     
-    with patch("app.routers.student_queries.get_db") as mock_get_db:
-        
-        # Mock database
-        mock_db = MagicMock()
-        mock_get_db.return_value = mock_db
-        
-        # Mock assessment not found
-        mock_query = MagicMock()
-        mock_query.filter().first.return_value = None
-        mock_db.query.return_value = mock_query
-        
-        request_data = {
-            "assessment_id": str(uuid4()),
-            "question_id": str(uuid4()),
-            "requested_change": "Test query for non-existent assessment",
-            "query_type": "regrade"
-        }
-        
-        response = client.post(
-            "/api/v1/student-queries/",
-            headers={"Authorization": f"Bearer {admin_token}"},
-            json=request_data
-        )
-        
-        assert response.status_code == 404
+    query_data = MarkQueryCreate(
+        assessment_id=fake_uuid(),
+        question_id=fake_uuid(),
+        requested_change="Test query for non-existent assessment",
+        query_type="regrade",
+    )
+    
+    with pytest.raises(HTTPException) as exc_info:
+        create_query(query_data, db=db_session, current_user=admin)
+    
+    assert exc_info.value.status_code == 404
 
 
-def test_create_query_question_not_found(client, admin_token):
+def test_create_query_question_not_found(db_session, admin, assessment, fake_uuid):
     """Test creating query with non-existent question"""
     
-    with patch("app.routers.student_queries.get_db") as mock_get_db:
-        
-        # Mock database
-        mock_db = MagicMock()
-        mock_get_db.return_value = mock_db
-        
-        # Mock assessment exists but question doesn't
-        mock_assessment = MagicMock()
-        mock_assessment.id = uuid4()
-        
-        assessment_query = MagicMock()
-        assessment_query.filter().first.return_value = mock_assessment
-        
-        question_query = MagicMock()
-        question_query.filter().first.return_value = None  # Question not found
-        
-        mock_db.query.side_effect = [assessment_query, question_query]
-        
-        request_data = {
-            "assessment_id": str(mock_assessment.id),
-            "question_id": str(uuid4()),
-            "requested_change": "Test query for non-existent question",
-            "query_type": "regrade"
-        }
-        
-        response = client.post(
-            "/api/v1/student-queries/",
-            headers={"Authorization": f"Bearer {admin_token}"},
-            json=request_data
-        )
-        
-        assert response.status_code == 404
+    query_data = MarkQueryCreate(
+        assessment_id=assessment.id,
+        question_id=fake_uuid(),
+        requested_change="Test query for non-existent question",
+        query_type="regrade",
+    )
+    
+    with pytest.raises(HTTPException) as exc_info:
+        create_query(query_data, db=db_session, current_user=admin)
+    
+    assert exc_info.value.status_code == 404
+    assert exc_info.value.detail == "Question not found"
 
 
-def test_create_batch_query_success(client, admin_token, assessment, question):
+def test_create_batch_query_success(client, auth_as, admin, assessment, question):
     """Test successfully creating a batch mark query"""
+    auth_as(admin)
     
     request_data = {
         "assessment_id": str(assessment.id),
@@ -146,159 +122,62 @@ def test_create_batch_query_success(client, admin_token, assessment, question):
         "assessment_level_note": "Batch query for one question"
     }
     
-    response = client.post(
-        "/api/v1/student-queries/batch",
-        headers={"Authorization": f"Bearer {admin_token}"},
-        json=request_data
-    )
+    response = client.post("/api/v1/student-queries/batch", json=request_data)
     
-    assert response.status_code == 200
+    assert response.status_code == 200, response.text
     data = response.json()
     # The API might be creating extra queries, let's just check it worked
     assert data["created_count"] >= 1
     assert len(data["query_ids"]) >= 1
 
 
-def test_get_my_queries(client, admin_token):
+def test_get_my_queries(db_session, admin):
     """Test getting user's queries"""
     
-    with patch("app.routers.student_queries.get_db") as mock_get_db:
-        
-        # Mock database
-        mock_db = MagicMock()
-        mock_get_db.return_value = mock_db
-        
-        # Mock queries
-        mock_queries = [MagicMock() for _ in range(2)]
-        mock_query = MagicMock()
-        mock_query.filter().all.return_value = mock_queries
-        mock_db.query.return_value = mock_query
-        
-        response = client.get(
-            "/api/v1/student-queries/my-queries",
-            headers={"Authorization": f"Bearer {admin_token}"}
-        )
-        
-        assert response.status_code == 200
+    assert get_my_queries(db=db_session, current_user=admin) == []
 
 
-def test_get_my_queries_grouped(client, admin_token):
+@pytest.mark.postgres  # array_agg / string_agg
+def test_get_my_queries_grouped(client, auth_as, admin):
     """Test getting user's queries grouped by assessment"""
+    auth_as(admin)
     
-    with patch("app.routers.student_queries.get_db") as mock_get_db:
-        
-        # Mock database
-        mock_db = MagicMock()
-        mock_get_db.return_value = mock_db
-        
-        # Mock queries
-        mock_queries = [MagicMock() for _ in range(2)]
-        mock_query = MagicMock()
-        mock_query.filter().all.return_value = mock_queries
-        mock_db.query.return_value = mock_query
-        
-        response = client.get(
-            "/api/v1/student-queries/my-queries-grouped",
-            headers={"Authorization": f"Bearer {admin_token}"}
-        )
-        
-        assert response.status_code == 200
+    response = client.get("/api/v1/student-queries/my-queries-grouped")
+    
+    assert response.status_code == 200
 
 
-def test_get_batch_queries(client, admin_token):
+def test_get_batch_queries(db_session, admin, fake_uuid):
     """Test getting batch queries"""
     
-    assessment_id = str(uuid4())
+    batch_id = str(fake_uuid())
     
-    with patch("app.routers.student_queries.get_db") as mock_get_db:
-        
-        # Mock database
-        mock_db = MagicMock()
-        mock_get_db.return_value = mock_db
-        
-        # Mock batch queries
-        mock_queries = [MagicMock() for _ in range(3)]
-        mock_query = MagicMock()
-        mock_query.filter().all.return_value = mock_queries
-        mock_db.query.return_value = mock_query
-        
-        response = client.get(
-            f"/api/v1/student-queries/batch/{assessment_id}",
-            headers={"Authorization": f"Bearer {admin_token}"}
-        )
-        
-        assert response.status_code == 200
+    assert get_batch_queries(batch_id, db=db_session, current_user=admin) == []
 
 
-def test_get_batch_queries_access_denied(client, admin_token):
+def test_get_batch_queries_access_denied(db_session, student, fake_uuid):
     """Test getting batch queries with access denied"""
     
-    assessment_id = str(uuid4())
+    batch_id = str(fake_uuid())
     
-    with patch("app.routers.student_queries.get_db") as mock_get_db:
-        
-        # Mock database
-        mock_db = MagicMock()
-        mock_get_db.return_value = mock_db
-        
-        # Mock empty result (simulating access denied)
-        mock_query = MagicMock()
-        mock_query.filter().all.return_value = []
-        mock_db.query.return_value = mock_query
-        
-        response = client.get(
-            f"/api/v1/student-queries/batch/{assessment_id}",
-            headers={"Authorization": f"Bearer {admin_token}"}
-        )
-        
-        # Even with access denied, the endpoint returns 200 with empty list
-        assert response.status_code == 200
+    # Even with access denied, the endpoint returns an empty list
+    assert get_batch_queries(batch_id, db=db_session, current_user=student) == []
 
 
-def test_get_query_not_found(client, admin_token):
+def test_get_query_not_found(db_session, admin, fake_uuid):
     """Test getting a non-existent query"""
     
-    query_id = str(uuid4())
+    with pytest.raises(HTTPException) as exc_info:
+        get_query(str(fake_uuid()), db=db_session, current_user=admin)
     
-    with patch("app.routers.student_queries.get_db") as mock_get_db:
-        
-        # Mock database
-        mock_db = MagicMock()
-        mock_get_db.return_value = mock_db
-        
-        # Mock query not found
-        mock_query = MagicMock()
-        mock_query.filter().first.return_value = None
-        mock_db.query.return_value = mock_query
-        
-        response = client.get(
-            f"/api/v1/student-queries/{query_id}",
-            headers={"Authorization": f"Bearer {admin_token}"}
-        )
-        
-        assert response.status_code == 404
+    assert exc_info.value.status_code == 404
 
 
-def test_get_query_access_denied(client, admin_token):
+def test_get_query_access_denied(db_session, student, fake_uuid):
     """Test getting a query with insufficient permissions"""
     
-    query_id = str(uuid4())
+    with pytest.raises(HTTPException) as exc_info:
+        get_query(str(fake_uuid()), db=db_session, current_user=student)
     
-    with patch("app.routers.student_queries.get_db") as mock_get_db:
-        
-        # Mock database
-        mock_db = MagicMock()
-        mock_get_db.return_value = mock_db
-        
-        # Mock query not found due to access control
-        mock_query = MagicMock()
-        mock_query.filter().first.return_value = None
-        mock_db.query.return_value = mock_query
-        
-        response = client.get(
-            f"/api/v1/student-queries/{query_id}",
-            headers={"Authorization": f"Bearer {admin_token}"}
-        )
-        
-        # Access denied returns 404 in this implementation
-        assert response.status_code == 404
\ No newline at end of file
+    # Access denied returns 404 in this implementation
+    assert exc_info.value.status_code == 404
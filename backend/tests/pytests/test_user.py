@@ -1,6 +1,9 @@
+import pytest
+
 from .conftest import auth_headers
 
 
+@pytest.mark.slow
 def test_create_user(client, admin, teacher_role_id):
     headers = auth_headers(admin)
     response = client.post(
@@ -21,6 +24,7 @@ def test_create_user(client, admin, teacher_role_id):
     assert data["email"] == "alice@example.com"
 
 
+@pytest.mark.slow
 def test_get_user_by_id(client, admin, teacher_role_id):
     headers = auth_headers(admin)
     create_response = client.post(
@@ -49,6 +53,7 @@ def test_list_users(client, admin):
     assert isinstance(response.json(), list)
 
 
+@pytest.mark.slow
 def test_update_user(client, admin, teacher_role_id):
     headers = auth_headers(admin)
     create_response = client.post(
@@ -75,6 +80,7 @@ def test_update_user(client, admin, teacher_role_id):
     assert update_response.json()["first_name"] == "Charles"
 
 
+@pytest.mark.slow
 def test_delete_user(client, admin, teacher_role_id):
     headers = auth_headers(admin)
     create_response = client.post(
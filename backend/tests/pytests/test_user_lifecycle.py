@@ -0,0 +1,31 @@
+from .conftest import auth_headers, ok
+
+
+def test_user_lifecycle(client, admin, teacher_role_id):
+    """Create, read, update and delete one user through the API"""
+    headers = auth_headers(admin)
+
+    created = ok(
+        client.post(
+            "/api/v1/users/",
+            json={
+                "first_name": "Charlie",
+                "last_name": "Change",
+                "email": "charlie@example.com",
+                "student_number": "11112222",
+                "password": "pass1234",
+                "primary_role_id": teacher_role_id,
+            },
+            headers=headers,
+        )
+    )
+    assert created["email"] == "charlie@example.com"
+    user_url = f"/api/v1/users/{created['id']}"
+
+    assert ok(client.get(user_url, headers=headers))["email"] == "charlie@example.com"
+
+    updated = ok(client.patch(user_url, json={"first_name": "Charles"}, headers=headers))
+    assert updated["first_name"] == "Charles"
+
+    ok(client.delete(user_url, headers=headers))
+    assert client.get(user_url, headers=headers).status_code == 404